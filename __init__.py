@@ -1,8 +1,17 @@
-from .math_nodes import MATH_NODE_CLASS_MAPPINGS, MATH_NODE_DISPLAY_NAME_MAPPINGS
+import os
 
-NODE_CLASS_MAPPINGS = {}
-NODE_CLASS_MAPPINGS.update(MATH_NODE_CLASS_MAPPINGS)
+from .registry import node_class_mappings, display_name_mappings
 
-NODE_DISPLAY_NAME_MAPPINGS = {}
-NODE_DISPLAY_NAME_MAPPINGS.update(MATH_NODE_DISPLAY_NAME_MAPPINGS)
+# Proxies that import their node module on first use, unless BASIC_MATH_EAGER_NODES is set
+NODE_CLASS_MAPPINGS = node_class_mappings()
 
+NODE_DISPLAY_NAME_MAPPINGS = display_name_mappings()
+
+# The prompt passes need the node modules, so they are only imported when some are enabled
+if os.environ.get("BASIC_MATH_PROMPT_PASSES"):
+    from .graph_passes import register_prompt_handler
+    register_prompt_handler()
+
+from .profiling import start_periodic_dump
+
+start_periodic_dump()
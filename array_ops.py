@@ -0,0 +1,53 @@
+"""
+NUMBER_ARRAY versions of the arithmetic kernels. Numbers combine with arrays by broadcasting,
+like the list nodes, and every result is a new NumberArray. Vectorized results become its
+buffer directly, so a chain of array nodes never unpacks the values into Python objects;
+the rest are computed element by element with the scalar operations and packed.
+"""
+from .sequences import NumberArray, pack
+from .operators import BASIC_MATH_OPS, UNARY_MATH_OPS, clamp as clamp_scalar, lerp as lerp_scalar
+
+
+def has_array(*values):
+    for x in values:
+        if type(x) is NumberArray:
+            return True
+    return False
+
+def as_batch(x):
+    """Arrays are batches already; a number is a one-element batch that broadcasts."""
+    return x if type(x) is NumberArray else [x]
+
+def list_nodes():
+    # Imported on use: list_nodes imports math_nodes, which imports this module
+    from . import list_nodes
+    return list_nodes
+
+def basic_math(a, b, operation):
+    batches = list_nodes()
+    a, b = as_batch(a), as_batch(b)
+    length = batches.broadcast_length(a, b)
+    result = batches.basic_math_vectorized(a, b, operation, length)
+    if result is None:
+        apply = BASIC_MATH_OPS[operation].apply
+        result = [apply(x, y) for x, y in zip(batches.broadcast(a, length), batches.broadcast(b, length))]
+    return pack(result)
+
+def unary_math(value, operation):
+    result = list_nodes().unary_math_vectorized(value, operation)
+    if result is None:
+        apply = UNARY_MATH_OPS[operation].apply
+        result = [apply(x) for x in value]
+    return pack(result)
+
+def clamp(value, min_value, max_value):
+    batches = list_nodes()
+    args = [as_batch(x) for x in (value, min_value, max_value)]
+    length = batches.broadcast_length(*args)
+    return pack([clamp_scalar(*x) for x in zip(*(batches.broadcast(arg, length) for arg in args))])
+
+def lerp(a, b, t):
+    batches = list_nodes()
+    args = [as_batch(x) for x in (a, b, t)]
+    length = batches.broadcast_length(*args)
+    return pack([lerp_scalar(*x) for x in zip(*(batches.broadcast(arg, length) for arg in args))])
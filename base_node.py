@@ -31,4 +31,10 @@ class ConstantsNode(BaseNode):
 class DebugNode(BaseNode):
     CATEGORY = f"{NODE_NAME}/Debug"
     
+class ListNode(BaseNode):
+    CATEGORY = f"{NODE_NAME}/List"
+    
+class SequenceNode(BaseNode):
+    CATEGORY = f"{NODE_NAME}/Sequence"
+    
     
\ No newline at end of file
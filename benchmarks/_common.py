@@ -0,0 +1,18 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+def load_package(name="basic_math"):
+    """
+    Import the node package from its directory without ComfyUI. The checkout directory
+    name is usually not a valid module name, so the package is registered under name.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, PACKAGE_ROOT / "__init__.py", submodule_search_locations=[str(PACKAGE_ROOT)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
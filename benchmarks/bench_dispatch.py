@@ -0,0 +1,170 @@
+"""
+Micro-benchmark of operator dispatch: the registry lookup used by the nodes against the
+if/elif chains they replaced. Run with `python benchmarks/bench_dispatch.py`.
+"""
+import argparse
+import math
+import timeit
+
+from _common import load_package
+
+
+class LegacyBasicMath:
+    def calculate(self, a, b, operation):
+        is_int_operation = isinstance(a, int) and isinstance(b, int) and operation != "/"
+        try:
+            if operation == "+":
+                result = a + b
+            elif operation == "-":
+                result = a - b
+            elif operation == "*":
+                result = a * b
+            elif operation == "/":
+                if b == 0:
+                    return (float('inf') if a > 0 else float('-inf'),)
+                result = a / b
+                is_int_operation = False
+            elif operation == "//":
+                if b == 0:
+                    return (float('inf') if a > 0 else float('-inf'),)
+                result = a // b
+            elif operation == "%":
+                if b == 0:
+                    return (float('nan'),)
+                result = a % b
+            elif operation == "**":
+                result = a ** b
+                if not isinstance(result, int):
+                    is_int_operation = False
+            elif operation == "min":
+                result = min(a, b)
+            elif operation == "max":
+                result = max(a, b)
+            if is_int_operation and isinstance(result, (int, float)) and result == int(result):
+                return (int(result),)
+            else:
+                return (float(result),)
+        except:
+            return (float('nan'),)
+
+class LegacyIntMath:
+    def calculate(self, a, b, operation):
+        try:
+            if operation == "+":
+                return (a + b,)
+            elif operation == "-":
+                return (a - b,)
+            elif operation == "*":
+                return (a * b,)
+            elif operation == "//":
+                if b == 0:
+                    return (0,)
+                return (a // b,)
+            elif operation == "%":
+                if b == 0:
+                    return (0,)
+                return (a % b,)
+            elif operation == "**":
+                return (a ** b,)
+            elif operation == "min":
+                return (min(a, b),)
+            elif operation == "max":
+                return (max(a, b),)
+            elif operation == "&":
+                return (a & b,)
+            elif operation == "|":
+                return (a | b,)
+            elif operation == "^":
+                return (a ^ b,)
+            elif operation == "<<":
+                return (a << b,)
+            elif operation == ">>":
+                return (a >> b,)
+        except:
+            return (0,)
+
+class LegacyUnaryMath:
+    def calculate(self, value, operation):
+        preserve_int = isinstance(value, int) and operation in ["abs", "neg"]
+        try:
+            if operation == "abs":
+                result = abs(value)
+            elif operation == "neg":
+                result = -value
+            elif operation == "sqrt":
+                result = math.sqrt(abs(value))
+                preserve_int = False
+            elif operation == "sin":
+                result = math.sin(value)
+                preserve_int = False
+            elif operation == "cos":
+                result = math.cos(value)
+                preserve_int = False
+            elif operation == "tan":
+                result = math.tan(value)
+                preserve_int = False
+            elif operation == "log":
+                result = math.log(abs(value)) if value != 0 else float('-inf')
+                preserve_int = False
+            elif operation == "log10":
+                result = math.log10(abs(value)) if value != 0 else float('-inf')
+                preserve_int = False
+            elif operation == "exp":
+                result = math.exp(value)
+                preserve_int = False
+            elif operation == "floor":
+                result = math.floor(value)
+                preserve_int = isinstance(value, int)
+            elif operation == "ceil":
+                result = math.ceil(value)
+                preserve_int = isinstance(value, int)
+            elif operation == "round":
+                result = round(value)
+                preserve_int = isinstance(value, int)
+            if preserve_int:
+                return (int(result),)
+            else:
+                return (float(result),)
+        except:
+            return (float('nan'),)
+
+
+def best_of(func, args, number, repeat):
+    timer = timeit.Timer("func(*args)", globals={"func": func, "args": args})
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100000, help="calls per timing")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per operation (best is kept)")
+    args = parser.parse_args()
+
+    package = load_package()
+    from basic_math.math_nodes import BasicMath, IntMath, UnaryMath
+    from basic_math.operators import POW_MOD_OPERATION
+
+    suites = [
+        ("BasicMath", BasicMath().calculate, LegacyBasicMath().calculate, lambda op: (7, 3, op)),
+        ("BasicMath", BasicMath().calculate, LegacyBasicMath().calculate, lambda op: (7.5, 2.5, op)),
+        ("IntMath", IntMath().calculate, LegacyIntMath().calculate, lambda op: (7, 3, op)),
+        ("UnaryMath", UnaryMath().calculate, LegacyUnaryMath().calculate, lambda op: (0.5, op)),
+    ]
+    print(f"{'node':<10} {'operation':<10} {'args':<14} {'if/elif ns':>11} {'registry ns':>12} {'saved':>7}")
+    for name, current, legacy, make_args in suites:
+        totals = [0.0, 0.0]
+        # pow mod postdates the if/elif nodes, so there is nothing to compare it against
+        operations = [op for op in package.NODE_CLASS_MAPPINGS[name].INPUT_TYPES()["required"]["operation"][0] if op != POW_MOD_OPERATION]
+        for operation in operations:
+            call_args = make_args(operation)
+            assert current(*call_args) == legacy(*call_args)
+            before = best_of(legacy, call_args, args.number, args.repeat)
+            after = best_of(current, call_args, args.number, args.repeat)
+            totals[0] += before
+            totals[1] += after
+            shown = ", ".join(repr(x) for x in call_args[:-1])
+            print(f"{name:<10} {operation:<10} {shown:<14} {before:>11.1f} {after:>12.1f} {1 - after / before:>7.1%}")
+        before, after = (total / len(operations) for total in totals)
+        print(f"{name:<10} {'(mean)':<10} {'':<14} {before:>11.1f} {after:>12.1f} {1 - after / before:>7.1%}")
+
+if __name__ == "__main__":
+    main()
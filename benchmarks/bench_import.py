@@ -0,0 +1,55 @@
+"""
+Import-time benchmark: lazy node registration against BASIC_MATH_EAGER_NODES=1. Each run
+imports the package in a fresh interpreter, counts the modules loaded by then, and then
+makes the first call to a node.
+Run with `python benchmarks/bench_import.py`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent
+
+CHILD = """
+import sys, time, json
+sys.path.insert(0, {benchmarks!r})
+start = time.perf_counter()
+from _common import load_package
+package = load_package()
+imported = time.perf_counter()
+modules = len(sys.modules)
+node_class = package.NODE_CLASS_MAPPINGS["BasicMath"]
+getattr(node_class(), node_class.FUNCTION)(a=1, b=2, operation="+")
+first_call = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_call_ms": (first_call - imported) * 1000,
+    "modules": modules,
+    "numpy": "numpy" in sys.modules,
+}}))
+"""
+
+def run_child(eager):
+    env = dict(os.environ)
+    env["BASIC_MATH_EAGER_NODES"] = "1" if eager else "0"
+    output = subprocess.run([sys.executable, "-c", CHILD.format(benchmarks=str(BENCHMARKS))], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per mode")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'import ms':>10} {'first call ms':>14} {'modules imported':>17} {'numpy':>6}")
+    for mode, eager in (("eager", True), ("lazy", False)):
+        runs = [run_child(eager) for _ in range(args.runs)]
+        import_ms = statistics.median(run["import_ms"] for run in runs)
+        first_call_ms = statistics.median(run["first_call_ms"] for run in runs)
+        print(f"{mode:<6} {import_ms:>10.1f} {first_call_ms:>14.1f} {runs[-1]['modules']:>17} {str(runs[-1]['numpy']):>6}")
+
+if __name__ == "__main__":
+    main()
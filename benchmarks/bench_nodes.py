@@ -0,0 +1,224 @@
+"""
+Benchmark every node in MATH_NODE_CLASS_MAPPINGS. Each node's FUNCTION is called for every
+combination of its choice inputs, with int, float, string or bool values depending on what
+its other inputs accept. Run with `python benchmarks/bench_nodes.py`; no ComfyUI is needed.
+
+    python benchmarks/bench_nodes.py --output before.json
+    python benchmarks/bench_nodes.py --output after.json --compare before.json
+"""
+import argparse
+import importlib
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+from _common import load_package
+
+# Values for inputs of a single type, taken by argument position
+SAMPLES = {
+    "INT": (7, 3, 2, 5),
+    "FLOAT": (7.5, 2.5, 0.5, 1.25),
+    "STRING": ("hello world", "hello", "world", "o w"),
+    "BOOLEAN": (True, False, True, False),
+}
+
+# Elements in each NUMBER_ARRAY sample, which run() adds to SAMPLES once the package is loaded
+ARRAY_SAMPLE_LENGTH = 16
+
+# Values for wildcard inputs, one case per kind
+ANY_SAMPLES = {
+    "INT": 7,
+    "FLOAT": 7.5,
+    "STRING": "42",
+    "BOOLEAN": True,
+}
+
+FUSED_PROGRAM = json.dumps({
+    "inputs": 2,
+    "nodes": [
+        {"class_type": "BasicMath", "static": {"operation": "*"}, "args": [{"input": 0}, {"input": 1}]},
+        {"class_type": "NumberClamp", "static": {}, "args": [{"node": 0}, {"value": 0}, {"value": 10}]},
+    ],
+    "outputs": [1],
+})
+
+# Per node: input name -> type to benchmark it as, for inputs whose declared type is too wide
+# or which are optional but essential to what the node does
+TYPE_OVERRIDES = {
+    "MathExpression": {"a": "INT,FLOAT", "b": "INT,FLOAT", "c": "INT,FLOAT", "d": "INT,FLOAT"},
+    "FusedMath": {"x0": "INT,FLOAT", "x1": "INT,FLOAT"},
+    # The Tensor variants need at least one NUMBER_ARRAY, IMAGE, MASK or LATENT operand
+    "BasicMathTensor": {"a": "NUMBER_ARRAY"},
+    "UnaryMathTensor": {"value": "NUMBER_ARRAY"},
+    "NumberClampTensor": {"value": "NUMBER_ARRAY"},
+    "NumberLerpTensor": {"a": "NUMBER_ARRAY"},
+}
+
+# Per node: input name -> fixed value
+VALUE_OVERRIDES = {
+    "MathExpression": {"expression": "a * b + c - d"},
+    "FusedMath": {"program": FUSED_PROGRAM},
+    "SelectByIndex": {"index": 0, "value_0": 7},
+}
+
+
+def input_types(node_class):
+    """(name, spec, required) for every input in declaration order."""
+    types = node_class.INPUT_TYPES()
+    for category in ("required", "optional"):
+        for name, spec in types.get(category, {}).items():
+            yield name, spec, category == "required"
+
+def accepted_types(spec):
+    """The concrete types an input accepts; None for a wildcard."""
+    input_type = str(spec[0])
+    if input_type == "*":
+        return None
+    return [t for t in input_type.split(",") if t in SAMPLES]
+
+def node_cases(name, node_class):
+    """Yield (case label, keyword arguments) for every benchmark case of a node."""
+    type_overrides = TYPE_OVERRIDES.get(name, {})
+    value_overrides = VALUE_OVERRIDES.get(name, {})
+    choices = {}
+    typed = {}
+    fixed = {}
+    for input_name, spec, required in input_types(node_class):
+        if input_name in value_overrides:
+            fixed[input_name] = value_overrides[input_name]
+        elif isinstance(spec[0], list):
+            choices[input_name] = spec[0]
+        elif input_name in type_overrides:
+            typed[input_name] = type_overrides[input_name].split(",")
+        elif required:
+            typed[input_name] = accepted_types(spec)
+
+    # Inputs that accept several types are benchmarked once per type, all with the same type
+    kinds = []
+    for accepted in typed.values():
+        if accepted is not None and len(accepted) == 1:
+            continue
+        for kind in accepted or ANY_SAMPLES:
+            if kind not in kinds:
+                kinds.append(kind)
+    kinds = kinds or [None]
+
+    for combination in itertools.product(*choices.values()):
+        for kind in kinds:
+            kwargs = dict(fixed)
+            kwargs.update(zip(choices, combination))
+            for position, (input_name, accepted) in enumerate(typed.items()):
+                if accepted is None:
+                    kwargs[input_name] = ANY_SAMPLES[kind]
+                else:
+                    input_type = kind if kind in accepted else accepted[0]
+                    kwargs[input_name] = SAMPLES[input_type][position % len(SAMPLES[input_type])]
+            label = " ".join(f"{key}={value}" for key, value in zip(choices, combination))
+            if kind is not None:
+                label = f"{label} [{kind.lower()}]".strip()
+            yield label, kwargs
+
+def measure(func, kwargs, number, repeat, warmup):
+    """Per-call latencies in nanoseconds, one per timing of number calls."""
+    timer = timeit.Timer("func(**kwargs)", globals={"func": func, "kwargs": kwargs})
+    timer.timeit(number=warmup)
+    return [total / number * 1e9 for total in timer.repeat(repeat=repeat, number=number)]
+
+def summarize(samples):
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    return {
+        "mean_ns": statistics.fmean(ordered),
+        "median_ns": median,
+        "stdev_ns": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min_ns": ordered[0],
+        "p95_ns": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "calls_per_second": 1e9 / median if median else None,
+    }
+
+def run(package, args):
+    results = []
+    # Node modules are imported on first use, so load math_nodes explicitly
+    mappings = importlib.import_module(f"{package.__name__}.math_nodes").MATH_NODE_CLASS_MAPPINGS
+    pack = importlib.import_module(f"{package.__name__}.sequences").pack
+    SAMPLES["NUMBER_ARRAY"] = tuple(pack([x] * ARRAY_SAMPLE_LENGTH) for x in SAMPLES["FLOAT"])
+    for name, node_class in mappings.items():
+        if args.filter and args.filter not in name:
+            continue
+        func = getattr(node_class(), node_class.FUNCTION)
+        for label, kwargs in node_cases(name, node_class):
+            result = {"node": name, "case": label}
+            try:
+                func(**kwargs)
+                result.update(summarize(measure(func, kwargs, args.number, args.repeat, args.warmup)))
+            except Exception as e:
+                result["error"] = repr(e)
+            results.append(result)
+            if not args.quiet:
+                print(format_result(result))
+    return results
+
+def format_result(result):
+    if "error" in result:
+        return f"{result['node']:<18} {result['case']:<40} error: {result['error']}"
+    return (f"{result['node']:<18} {result['case']:<40} {result['median_ns']:>9.1f} {result['p95_ns']:>9.1f} "
+            f"{result['stdev_ns']:>8.1f} {result['calls_per_second']:>12,.0f}")
+
+def compare(results, baseline, threshold):
+    """Print median changes against a baseline run and return the number of regressions."""
+    previous = {(r["node"], r["case"]): r for r in baseline["results"] if "median_ns" in r}
+    regressions = 0
+    print(f"\n{'node':<18} {'case':<40} {'before ns':>9} {'after ns':>9} {'change':>8}")
+    for result in results:
+        before = previous.get((result["node"], result["case"]))
+        if before is None or "median_ns" not in result:
+            continue
+        change = result["median_ns"] / before["median_ns"] - 1
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{result['node']:<18} {result['case']:<40} {before['median_ns']:>9.1f} {result['median_ns']:>9.1f} {change:>+8.1%}{flag}")
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing")
+    parser.add_argument("--repeat", type=int, default=15, help="timings per case")
+    parser.add_argument("--warmup", type=int, default=200, help="untimed calls before timing")
+    parser.add_argument("--filter", help="only benchmark nodes whose name contains this")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="median slowdown reported as a regression")
+    parser.add_argument("--quiet", action="store_true", help="don't print each case")
+    args = parser.parse_args()
+
+    package = load_package()
+    if not args.quiet:
+        print(f"{'node':<18} {'case':<40} {'median ns':>9} {'p95 ns':>9} {'stdev':>8} {'calls/s':>12}")
+    results = run(package, args)
+
+    if args.output:
+        report = {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": {"number": args.number, "repeat": args.repeat, "warmup": args.warmup},
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Regression check for fused program validation: every malformed program must be rejected
+with ValueError before any source is generated. Run with `python benchmarks/check_fused_programs.py`.
+"""
+import json
+import sys
+
+from _common import load_package
+
+
+def add(*args):
+    return {"class_type": "BasicMath", "static": {"operation": "+"}, "args": list(args)}
+
+VALID = {"inputs": 2, "nodes": [add({"input": 0}, {"input": 1}), add({"node": 0}, {"value": 1})], "outputs": [1]}
+
+REJECTED = {
+    "not an object": [],
+    "missing outputs": {"inputs": 1, "nodes": []},
+    "extra top-level key": dict(VALID, extra=1),
+    "bool input count": dict(VALID, inputs=True),
+    "too many inputs": dict(VALID, inputs=33),
+    "string output index": dict(VALID, outputs=["0"]),
+    "bool output index": dict(VALID, outputs=[False]),
+    "output out of range": dict(VALID, outputs=[2]),
+    "source in output index": dict(VALID, outputs=["0, __import__('os')"]),
+    "extra node key": dict(VALID, nodes=[dict(add({"input": 0}, {"input": 1}), extra=1)]),
+    "unknown class_type": dict(VALID, nodes=[dict(add({"input": 0}, {"input": 1}), class_type="FusedMath")], outputs=[0]),
+    "invalid operation": dict(VALID, nodes=[dict(add({"input": 0}, {"input": 1}), static={"operation": "@"})], outputs=[0]),
+    "extra static key": dict(VALID, nodes=[dict(add({"input": 0}, {"input": 1}), static={"operation": "+", "x": 1})], outputs=[0]),
+    "wrong argument count": dict(VALID, nodes=[add({"input": 0})], outputs=[0]),
+    "bool input index": dict(VALID, nodes=[add({"input": True}, {"input": 1})], outputs=[0]),
+    "input out of range": dict(VALID, nodes=[add({"input": 0}, {"input": 2})], outputs=[0]),
+    "string node index": dict(VALID, nodes=[add({"input": 0}, {"input": 1}), add({"node": "0"}, {"value": 1})]),
+    "forward node reference": dict(VALID, nodes=[add({"node": 1}, {"input": 1}), add({"input": 0}, {"value": 1})]),
+    "self reference": dict(VALID, nodes=[add({"node": 0}, {"input": 1})], outputs=[0]),
+    "unknown operand kind": dict(VALID, nodes=[add({"input": 0}, {"name": "x"})], outputs=[0]),
+    "operand with two keys": dict(VALID, nodes=[add({"input": 0}, {"input": 1, "value": 1})], outputs=[0]),
+}
+
+def main():
+    load_package()
+    from basic_math.fusion import compile_program
+
+    failures = 0
+    fused = compile_program(json.dumps(VALID))
+    if fused(2, 3) != (6,):
+        print(f"valid program: expected (6,), got {fused(2, 3)!r}")
+        failures += 1
+    for name, program in REJECTED.items():
+        try:
+            compile_program(json.dumps(program))
+        except ValueError:
+            continue
+        except Exception as e:
+            print(f"{name}: raised {type(e).__name__}: {e}")
+        else:
+            print(f"{name}: accepted")
+        failures += 1
+    print(f"{len(REJECTED) + 1 - failures}/{len(REJECTED) + 1} fused program checks passed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
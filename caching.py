@@ -0,0 +1,76 @@
+"""
+Cache support for pure nodes. fingerprint() turns node inputs into a key that is equal exactly
+when the inputs are: values are tagged with their type so 1, 1.0 and True differ, and every
+nan equals every other nan. The cse prompt pass keys nodes by it. BigIntMemo keeps the results
+of expensive big-integer operations within an entry and size budget.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from .tools import env_int
+
+# Entries and total result bits the big-integer memo may hold (default 8 MiB of digits)
+MEMO_ENTRIES = env_int("BASIC_MATH_MEMO_ENTRIES", 64)
+MEMO_BITS = env_int("BASIC_MATH_MEMO_BITS", 1 << 26)
+# Results smaller than this are cheaper to recompute than to look up
+MEMO_MIN_BITS = 1 << 16
+
+
+def fingerprint(value):
+    """Hashable, type-tagged key for value. Objects other than plain data are keyed by identity."""
+    if value is None:
+        return None
+    kind = type(value)
+    if kind is float:
+        # hex keeps -0.0 apart from 0.0; every nan payload maps to the same key
+        return ("float", "nan" if value != value else value.hex())
+    if kind in (int, bool, str):
+        return (kind.__name__, value)
+    if kind in (list, tuple):
+        return (kind.__name__, tuple(map(fingerprint, value)))
+    if kind is dict:
+        return ("dict", tuple((key, fingerprint(value[key])) for key in sorted(value)))
+    # Subclasses such as numpy.float64 key like the builtin they compute as
+    if isinstance(value, float):
+        return fingerprint(float(value))
+    if isinstance(value, int):
+        return fingerprint(int(value))
+    if isinstance(value, str):
+        return fingerprint(str(value))
+    # Tensors, latents and sequences are never mutated by the nodes, so identity is enough
+    return (kind.__name__, id(value))
+
+class BigIntMemo:
+    """Least recently used results of big-integer operations, bounded by count and total bits."""
+    def __init__(self, max_entries, max_bits):
+        self.max_entries = max_entries
+        self.max_bits = max_bits
+        self.entries = OrderedDict()
+        self.bits = 0
+        self.lock = Lock()
+
+    def get(self, key, compute):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+                return result
+        result = compute()
+        size = result.bit_length()
+        if self.max_entries <= 0 or size > self.max_bits:
+            return result
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = result
+                self.bits += size
+            while len(self.entries) > self.max_entries or self.bits > self.max_bits:
+                _, evicted = self.entries.popitem(last=False)
+                self.bits -= evicted.bit_length()
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bits = 0
+
+BIG_INT_MEMO = BigIntMemo(MEMO_ENTRIES, MEMO_BITS)
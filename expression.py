@@ -0,0 +1,140 @@
+import ast
+from functools import lru_cache
+
+from .operators import BASIC_MATH_OPS, UNARY_MATH_OPS, COMPARISON_OPS, MATH_CONSTANTS, clamp, lerp
+
+# Names the inputs of a MathExpression node are bound to, in call order
+VARIABLES = ("a", "b", "c", "d")
+
+EXPRESSION_CACHE_SIZE = 256
+
+BINARY_OPERATORS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.Pow: "**",
+}
+
+COMPARE_OPERATORS = {
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.Lt: "<",
+    ast.Gt: ">",
+    ast.LtE: "<=",
+    ast.GtE: ">=",
+}
+
+# Callable functions: name -> (implementation, number of arguments)
+FUNCTIONS = {name: (op.apply, 1) for name, op in UNARY_MATH_OPS.items()}
+FUNCTIONS.update({
+    "min": (BASIC_MATH_OPS["min"].apply, 2),
+    "max": (BASIC_MATH_OPS["max"].apply, 2),
+    "pow": (BASIC_MATH_OPS["**"].apply, 2),
+    "clamp": (clamp, 3),
+    "lerp": (lerp, 3),
+})
+
+# Globals of compiled expressions. User names can't start with "_", so helpers can't be shadowed.
+NAMESPACE = {"__builtins__": {}}
+for node_type, symbol in BINARY_OPERATORS.items():
+    NAMESPACE[f"_{node_type.__name__}"] = BASIC_MATH_OPS[symbol].apply
+for node_type, symbol in COMPARE_OPERATORS.items():
+    NAMESPACE[f"_{node_type.__name__}"] = COMPARISON_OPS[symbol].func
+for name, (func, _) in FUNCTIONS.items():
+    NAMESPACE[f"_fn_{name}"] = func
+
+
+class ExpressionCompiler(ast.NodeTransformer):
+    """
+    Check an expression against the whitelist and rewrite its operators into calls to the
+    same pre-bound operations the nodes use, so results follow the nodes' int/float rules.
+    """
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+    def call(self, name, args, node):
+        return ast.copy_location(ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[]), node)
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float, bool):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        return node
+
+    def visit_Name(self, node):
+        if node.id in VARIABLES:
+            return node
+        if node.id in MATH_CONSTANTS:
+            return ast.copy_location(ast.Constant(value=MATH_CONSTANTS[node.id]), node)
+        raise ValueError(f"Unknown name: {node.id}")
+
+    def visit_BinOp(self, node):
+        if type(node.op) not in BINARY_OPERATORS:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        return self.call(f"_{type(node.op).__name__}", [self.visit(node.left), self.visit(node.right)], node)
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.USub):
+            return self.call("_fn_neg", [operand], node)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.op, ast.Not):
+            node.operand = operand
+            return node
+        raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+
+    def visit_BoolOp(self, node):
+        node.values = [self.visit(value) for value in node.values]
+        return node
+
+    def visit_IfExp(self, node):
+        node.test = self.visit(node.test)
+        node.body = self.visit(node.body)
+        node.orelse = self.visit(node.orelse)
+        return node
+
+    def visit_Compare(self, node):
+        operands = [self.visit(node.left)] + [self.visit(x) for x in node.comparators]
+        comparisons = []
+        for op, left, right in zip(node.ops, operands, operands[1:]):
+            if type(op) not in COMPARE_OPERATORS:
+                raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+            comparisons.append(self.call(f"_{type(op).__name__}", [left, right], node))
+        if len(comparisons) == 1:
+            return comparisons[0]
+        # Chained comparisons such as 0 <= a < 1; operands are pure, so repeating one is safe
+        return ast.copy_location(ast.BoolOp(op=ast.And(), values=comparisons), node)
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ValueError(f"Unknown function: {ast.unparse(node.func)}")
+        if node.keywords:
+            raise ValueError(f"{node.func.id}() does not take keyword arguments")
+        name = node.func.id
+        arity = FUNCTIONS[name][1]
+        if len(node.args) != arity or any(isinstance(x, ast.Starred) for x in node.args):
+            raise ValueError(f"{name}() takes {arity} argument{'s' if arity != 1 else ''}")
+        return self.call(f"_fn_{name}", [self.visit(x) for x in node.args], node)
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    """
+    Compile a formula over the variables a, b, c and d into a function taking them
+    positionally. Compiled functions are cached by expression text.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {text!r}: {e.msg}") from None
+    body = ExpressionCompiler().visit(tree).body
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name in VARIABLES], kwonlyargs=[], kw_defaults=[], defaults=[])
+    function = ast.Expression(body=ast.Lambda(args=arguments, body=body))
+    ast.fix_missing_locations(function)
+    return eval(compile(function, "<expression>", "eval"), NAMESPACE)
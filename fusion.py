@@ -0,0 +1,139 @@
+"""
+Compile chains of math nodes into one Python function.
+
+A program is the JSON text of
+    {"inputs": n, "nodes": [{"class_type": ..., "static": {...}, "args": [operand, ...]}, ...], "outputs": [node index, ...]}
+where an operand is {"input": k} for the k-th external input, {"node": j} for the result of
+an earlier node, or {"value": literal}. Each node runs the same pre-bound operation its
+standalone node uses, so type promotion and error values are unchanged.
+"""
+import json
+from functools import lru_cache
+
+from .operators import BASIC_MATH_OPS, UNARY_MATH_OPS, COMPARISON_OPS, BOOLEAN_LOGIC_OPS, clamp, lerp
+from . import tensor_ops
+
+# External inputs a fused node can take
+MAX_FUSED_INPUTS = 32
+
+PROGRAM_CACHE_SIZE = 256
+
+class FusibleNode:
+    """
+    How to fuse one node class: its linkable argument names in call order, the inputs that
+    must be literals, and a function mapping those literals to the kernel to call.
+    tensor_kernel does the same for the node's torch path, if it has one.
+    """
+    def __init__(self, arguments, static, kernel, tensor_kernel=None):
+        self.arguments = arguments
+        self.static = static
+        self.kernel = kernel
+        self.tensor_kernel = tensor_kernel
+
+FUSIBLE_NODES = {
+    "BasicMath": FusibleNode(
+        ("a", "b"), ("operation",), lambda operation: BASIC_MATH_OPS[operation].apply,
+        lambda operation: lambda a, b: tensor_ops.basic_math(a, b, operation),
+    ),
+    "UnaryMath": FusibleNode(
+        ("value",), ("operation",), lambda operation: UNARY_MATH_OPS[operation].apply,
+        lambda operation: lambda value: tensor_ops.unary_math(value, operation),
+    ),
+    "NumberClamp": FusibleNode(("value", "min_value", "max_value"), (), lambda: clamp, lambda: tensor_ops.clamp),
+    "NumberLerp": FusibleNode(("a", "b", "t"), (), lambda: lerp, lambda: tensor_ops.lerp),
+    "NumberComparison": FusibleNode(("a", "b"), ("operation",), lambda operation: COMPARISON_OPS[operation].func),
+    "BooleanLogic": FusibleNode(("a", "b"), ("operation",), lambda operation: BOOLEAN_LOGIC_OPS[operation].func),
+}
+
+def node_kernel(fusible, static, tensors):
+    kernel = fusible.kernel(**static)
+    if tensors and fusible.tensor_kernel is not None:
+        # Each call still checks its own arguments: a tensor may only reach part of the chain
+        return tensor_ops.tensor_aware(kernel, fusible.tensor_kernel(**static))
+    return kernel
+
+def generate_source(program, tensors=False):
+    """
+    Return (source of a function `fused`, namespace it needs) for a parsed program.
+    With tensors, nodes that have a torch path dispatch on their arguments at each call.
+    """
+    namespace = {}
+    def operand(spec):
+        if "input" in spec:
+            return f"x{spec['input']}"
+        if "node" in spec:
+            return f"v{spec['node']}"
+        name = f"c{len(namespace)}"
+        namespace[name] = spec["value"]
+        return name
+
+    parameters = ", ".join(f"x{k}" for k in range(program["inputs"]))
+    lines = [f"def fused({parameters}):"]
+    for index, node in enumerate(program["nodes"]):
+        fusible = FUSIBLE_NODES[node["class_type"]]
+        kernel = f"k{index}"
+        namespace[kernel] = node_kernel(fusible, node.get("static", {}), tensors)
+        arguments = ", ".join(operand(spec) for spec in node["args"])
+        lines.append(f"    v{index} = {kernel}({arguments})")
+    outputs = "".join(f"v{index}, " for index in program["outputs"])
+    lines.append(f"    return ({outputs})")
+    return "\n".join(lines) + "\n", namespace
+
+def is_index(value, limit):
+    # bool is an int subclass but never a valid index
+    return type(value) is int and 0 <= value < limit
+
+def validate_program(program):
+    """
+    Raise ValueError unless program has exactly the shape described above. The text comes
+    from a node input, and its indices end up in generated source, so nothing else may pass.
+    """
+    if not isinstance(program, dict) or set(program) != {"inputs", "nodes", "outputs"}:
+        raise ValueError("Fused program must have exactly inputs, nodes and outputs")
+    inputs, nodes, outputs = program["inputs"], program["nodes"], program["outputs"]
+    if not is_index(inputs, MAX_FUSED_INPUTS + 1):
+        raise ValueError(f"Fused program inputs must be an int from 0 to {MAX_FUSED_INPUTS}")
+    if not isinstance(nodes, list) or not isinstance(outputs, list):
+        raise ValueError("Fused program nodes and outputs must be lists")
+    for index, node in enumerate(nodes):
+        if not isinstance(node, dict) or not set(node) <= {"class_type", "static", "args"}:
+            raise ValueError(f"Fused node {index} has unexpected keys")
+        fusible = FUSIBLE_NODES.get(node.get("class_type")) if isinstance(node.get("class_type"), str) else None
+        if fusible is None:
+            raise ValueError(f"Fused node {index} has an unsupported class_type")
+        static = node.get("static", {})
+        if not isinstance(static, dict) or set(static) != set(fusible.static):
+            raise ValueError(f"Fused node {index} must set exactly {list(fusible.static)}")
+        try:
+            fusible.kernel(**static)
+        except (KeyError, TypeError):
+            raise ValueError(f"Fused node {index} has an invalid operation") from None
+        args = node.get("args")
+        if not isinstance(args, list) or len(args) != len(fusible.arguments):
+            raise ValueError(f"Fused node {index} takes {len(fusible.arguments)} arguments")
+        for spec in args:
+            if not isinstance(spec, dict) or len(spec) != 1:
+                raise ValueError(f"Fused node {index} has an invalid operand")
+            (kind, value), = spec.items()
+            if kind == "input" and is_index(value, inputs):
+                continue
+            if kind == "node" and is_index(value, index):
+                continue
+            if kind != "value":
+                raise ValueError(f"Fused node {index} has an invalid operand {spec!r}")
+    if not all(is_index(output, len(nodes)) for output in outputs):
+        raise ValueError("Fused program outputs must be indices of its nodes")
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def compile_program(text, tensors=False):
+    """
+    Compile program text into a function of its external inputs returning a tuple of outputs.
+    Pass tensors=True when any input may be a tensor or LATENT. Raises ValueError for
+    programs that are not well formed.
+    """
+    program = json.loads(text)
+    validate_program(program)
+    source, namespace = generate_source(program, tensors)
+    namespace["__builtins__"] = {}
+    exec(compile(source, "<fused math>", "exec"), namespace)
+    return namespace["fused"]
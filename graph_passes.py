@@ -0,0 +1,426 @@
+"""
+Prompt-level rewrites for this package's nodes. Each pass takes a ComfyUI prompt (the
+{node_id: {"class_type": ..., "inputs": ...}} dict sent to /prompt), returns a rewritten
+copy, and never modifies its argument.
+"""
+import json
+import logging
+import math
+import os
+
+from .caching import fingerprint
+from .fusion import FUSIBLE_NODES, MAX_FUSED_INPUTS
+from .operators import (
+    BASIC_MATH_OPS, INT_MATH_OPS, COMPARISON_OPS, STRING_COMPARISON_OPS, BOOLEAN_LOGIC_OPS,
+    REGEX_OPERATION, SHORT_CIRCUIT_OPS, estimated_bits,
+)
+
+# Nodes whose output depends only on their inputs
+PURE_NODES = {
+    "IntegerInput", "FloatInput", "PreciseFloatInput", "BooleanInput", "StringInput",
+    "ToInt", "ToFloat", "ToString", "ToBool",
+    "BasicMath", "IntMath", "UnaryMath", "MathExpression", "MathConstants",
+    "NumberRound", "NumberClamp", "NumberLerp", "NumberInRange",
+    "NumberComparison", "IntegerComparison", "FloatComparison", "StringComparison",
+    "BooleanLogic", "BooleanUnary", "FusedMath",
+}
+
+# Pure nodes fold can replace: a literal node has one output, so multi-output nodes are left out
+FOLDABLE_NODES = PURE_NODES - {"FusedMath"}
+
+# Pure nodes that pass LATENT dicts through, and those whose outputs are never tensors or LATENTs
+LATENT_NODES = {"BasicMath", "UnaryMath", "NumberClamp", "NumberLerp", "FusedMath"}
+SCALAR_NODES = PURE_NODES - LATENT_NODES
+
+# Nodes that already are a single literal value
+LITERAL_NODES = {"IntegerInput", "FloatInput", "PreciseFloatInput", "BooleanInput", "StringInput"}
+
+# Nodes whose operation input names an operation in the table, applied to inputs a and b
+OPERATION_TABLES = {
+    "BasicMath": BASIC_MATH_OPS,
+    "IntMath": INT_MATH_OPS,
+    "NumberComparison": COMPARISON_OPS,
+    "IntegerComparison": COMPARISON_OPS,
+    "FloatComparison": COMPARISON_OPS,
+    "StringComparison": STRING_COMPARISON_OPS,
+    "BooleanLogic": BOOLEAN_LOGIC_OPS,
+}
+
+# Comma-separated pass names to run on every submitted prompt, e.g. "fold"
+PROMPT_PASSES_ENV = "BASIC_MATH_PROMPT_PASSES"
+
+INT_LIMIT = 0xffffffffffffffff
+FLOAT_LIMIT = 999999999999.0
+
+# Largest integer, in bits, fold works with. Passes run on the server's request thread, so
+# nodes that could take longer (big powers, shifts, regexes) are left to run as usual.
+FOLD_MAX_BITS = 1024
+
+
+def is_link(value):
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[1], int)
+
+def copy_prompt(prompt):
+    """Copy each node and its inputs dict; input values themselves are shared."""
+    return {node_id: dict(node, inputs=dict(node.get("inputs", {}))) for node_id, node in prompt.items()}
+
+def topological_order(prompt):
+    """Node ids ordered so every node comes after the nodes it links to."""
+    order = []
+    state = {}
+    for root in prompt:
+        if root in state:
+            continue
+        stack = [(root, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            if expanded:
+                state[node_id] = True
+                order.append(node_id)
+                continue
+            if node_id in state:
+                continue
+            state[node_id] = False
+            stack.append((node_id, True))
+            for value in prompt[node_id].get("inputs", {}).values():
+                if is_link(value) and value[0] in prompt and value[0] not in state:
+                    stack.append((value[0], False))
+    return order
+
+def count_consumers(prompt):
+    """node_id -> number of inputs linking to it."""
+    consumers = {}
+    for node in prompt.values():
+        for value in node.get("inputs", {}).values():
+            if is_link(value):
+                consumers[value[0]] = consumers.get(value[0], 0) + 1
+    return consumers
+
+def prune_unreferenced(prompt, candidates):
+    """Remove candidate nodes that nothing links to any more, repeating as links disappear."""
+    consumers = count_consumers(prompt)
+    pending = [node_id for node_id in candidates if node_id in prompt]
+    while pending:
+        node_id = pending.pop()
+        if node_id not in prompt or consumers.get(node_id, 0) > 0:
+            continue
+        for value in prompt.pop(node_id).get("inputs", {}).values():
+            if is_link(value) and value[0] in candidates:
+                consumers[value[0]] -= 1
+                pending.append(value[0])
+
+def consumer_map(prompt):
+    """node_id -> list of (consumer id, input name) linking to it."""
+    consumers = {}
+    for node_id, node in prompt.items():
+        for name, value in node.get("inputs", {}).items():
+            if is_link(value):
+                consumers.setdefault(value[0], []).append((node_id, name))
+    return consumers
+
+def math_node_classes():
+    # Imported on first use so registering the prompt handler doesn't load the node modules
+    from .math_nodes import MATH_NODE_CLASS_MAPPINGS
+    return MATH_NODE_CLASS_MAPPINGS
+
+def coerce_literal(class_type, name, value):
+    """Apply the conversion ComfyUI performs on a widget value of a primitive input type."""
+    inputs = math_node_classes()[class_type].INPUT_TYPES()
+    spec = inputs.get("required", {}).get(name) or inputs.get("optional", {}).get(name)
+    input_type = spec[0] if spec else None
+    if input_type == "INT":
+        return int(value)
+    if input_type == "FLOAT":
+        return float(value)
+    if input_type == "BOOLEAN":
+        return bool(value)
+    if input_type == "STRING":
+        return str(value)
+    return value
+
+def evaluate_node(node, inputs, node_classes=None):
+    node_class = (node_classes or math_node_classes())[node["class_type"]]
+    return getattr(node_class(), node_class.FUNCTION)(**inputs)[0]
+
+def literal_node(value, return_type):
+    """A literal node producing value with the same output type, or None if there is none."""
+    if isinstance(value, bool):
+        return {"class_type": "BooleanInput", "inputs": {"value": value}}
+    if isinstance(value, str):
+        return {"class_type": "StringInput", "inputs": {"value": value}}
+    if isinstance(value, int) and return_type == "INT" and -INT_LIMIT <= value <= INT_LIMIT:
+        return {"class_type": "IntegerInput", "inputs": {"value": value}}
+    if isinstance(value, float) and return_type == "FLOAT" and math.isfinite(value) and -FLOAT_LIMIT <= value <= FLOAT_LIMIT:
+        return {"class_type": "PreciseFloatInput", "inputs": {"value": value}}
+    if type(value) in (int, float):
+        # repr round-trips every int and float, including inf, -inf and nan
+        return {"class_type": "MathExpression", "inputs": {"expression": repr(value)}}
+    return None
+
+def cheap_to_fold(class_type, inputs):
+    """Whether a node with these inputs surely evaluates quickly enough to fold."""
+    operation = inputs.get("operation")
+    if class_type == "MathExpression":
+        expression = str(inputs.get("expression", ""))
+        return "**" not in expression and "pow" not in expression
+    if class_type == "StringComparison":
+        return operation != REGEX_OPERATION
+    if class_type in ("BasicMath", "IntMath"):
+        operands = [inputs.get(name) for name in ("a", "b", "modulus")]
+        if any(type(x) is int and x.bit_length() > FOLD_MAX_BITS for x in operands):
+            return False
+        a, b = operands[:2]
+        # pow mod and wrapped results stay below the modulus, so bounded operands are enough
+        if operation in ("**", "<<") and not inputs.get("wrap_64bit") and type(a) is int and type(b) is int:
+            return estimated_bits(a, b, operation) <= FOLD_MAX_BITS
+    return True
+
+def fold_constants(prompt):
+    """
+    Evaluate every pure node whose inputs are all literals or other constant nodes, replace
+    the constant nodes that non-constant nodes still depend on with a single literal node,
+    and drop the rest. Returns (new prompt, number of node executions saved).
+    """
+    values = {}
+    for node_id in topological_order(prompt):
+        node = prompt[node_id]
+        if node.get("class_type") not in FOLDABLE_NODES:
+            continue
+        inputs = {}
+        try:
+            for name, value in node.get("inputs", {}).items():
+                if is_link(value):
+                    if value[0] not in values or value[1] != 0:
+                        break
+                    value = values[value[0]]
+                else:
+                    value = coerce_literal(node["class_type"], name, value)
+                inputs[name] = value
+            else:
+                if cheap_to_fold(node["class_type"], inputs):
+                    values[node_id] = evaluate_node(node, inputs)
+        except Exception:
+            pass
+
+    folded = copy_prompt(prompt)
+    consumers = count_consumers({node_id: node for node_id, node in prompt.items() if node_id not in values})
+    for node_id, value in values.items():
+        node = folded[node_id]
+        if node_id not in consumers or node["class_type"] in LITERAL_NODES:
+            continue
+        # A node fed only by widget values has nothing to collapse
+        if not any(is_link(value) for value in node["inputs"].values()):
+            continue
+        return_type = math_node_classes()[node["class_type"]].RETURN_TYPES[0]
+        replacement = literal_node(value, return_type)
+        if replacement is None:
+            continue
+        node["class_type"] = replacement["class_type"]
+        node["inputs"] = replacement["inputs"]
+    # Constant nodes whose consumers were all folded are no longer needed. Nodes nothing
+    # linked to in the first place never ran, so they are left alone.
+    referenced = count_consumers(prompt)
+    prune_unreferenced(folded, {node_id for node_id in values if node_id in referenced})
+    return folded, len(prompt) - len(folded)
+
+def fusible(node):
+    """Whether a node can join a fused chain: a fusible class with literal static inputs."""
+    spec = FUSIBLE_NODES.get(node.get("class_type"))
+    if spec is None:
+        return False
+    inputs = node.get("inputs", {})
+    if any(name not in inputs or is_link(inputs[name]) for name in spec.static):
+        return False
+    # Fused Math evaluates all of its inputs, which would undo Boolean Logic's lazy b
+    if node["class_type"] == "BooleanLogic" and is_link(inputs.get("b")) and inputs["operation"] in SHORT_CIRCUIT_OPS:
+        return False
+    return all(name in inputs for name in spec.arguments)
+
+def convex(component, consumers):
+    """Whether no path leaves the component and comes back, which fusing would turn into a cycle."""
+    stack = [consumer for node_id in component for consumer, _ in consumers.get(node_id, []) if consumer not in component]
+    seen = set()
+    while stack:
+        node_id = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        for consumer, _ in consumers.get(node_id, []):
+            if consumer in component:
+                return False
+            stack.append(consumer)
+    return True
+
+def fusible_components(prompt, consumers, min_nodes):
+    """Connected groups of linked fusible nodes, each in topological order."""
+    candidates = {node_id for node_id, node in prompt.items() if fusible(node)}
+    neighbours = {node_id: set() for node_id in candidates}
+    for node_id in candidates:
+        for value in prompt[node_id]["inputs"].values():
+            if is_link(value) and value[0] in candidates and value[1] == 0:
+                neighbours[node_id].add(value[0])
+                neighbours[value[0]].add(node_id)
+    order = {node_id: index for index, node_id in enumerate(topological_order(prompt))}
+    components = []
+    seen = set()
+    for root in candidates:
+        if root in seen:
+            continue
+        component = set()
+        stack = [root]
+        while stack:
+            node_id = stack.pop()
+            if node_id in component:
+                continue
+            component.add(node_id)
+            stack.extend(neighbours[node_id] - component)
+        seen |= component
+        if len(component) >= min_nodes and convex(component, consumers):
+            components.append(sorted(component, key=order.__getitem__))
+    return components
+
+def build_program(prompt, component, consumers):
+    """
+    Describe a component as a fusion program. Returns (program, external input links,
+    node ids whose results are used outside the component), or None if it has too many inputs.
+    """
+    members = set(component)
+    index = {node_id: i for i, node_id in enumerate(component)}
+    external = []
+    nodes = []
+    for node_id in component:
+        node = prompt[node_id]
+        spec = FUSIBLE_NODES[node["class_type"]]
+        inputs = node["inputs"]
+        args = []
+        for name in spec.arguments:
+            value = inputs[name]
+            if is_link(value) and value[0] in members and value[1] == 0:
+                args.append({"node": index[value[0]]})
+            elif is_link(value):
+                if value not in external:
+                    external.append(value)
+                args.append({"input": external.index(value)})
+            else:
+                args.append({"value": coerce_literal(node["class_type"], name, value)})
+        static = {name: inputs[name] for name in spec.static}
+        nodes.append({"class_type": node["class_type"], "static": static, "args": args})
+    if len(external) > MAX_FUSED_INPUTS:
+        return None
+    outputs = [node_id for node_id in component if any(consumer not in members for consumer, _ in consumers.get(node_id, []))]
+    program = {"inputs": len(external), "nodes": nodes, "outputs": [index[node_id] for node_id in outputs]}
+    return program, external, outputs
+
+def fuse_math_chains(prompt, min_nodes=2):
+    """
+    Replace each connected group of fusible math nodes with one FusedMath node running the
+    whole group as a single generated function, and rewire consumers to its outputs.
+    Returns (new prompt, number of node executions saved).
+    """
+    fused = copy_prompt(prompt)
+    consumers = consumer_map(prompt)
+    for component in fusible_components(prompt, consumers, min_nodes):
+        built = build_program(prompt, component, consumers)
+        if built is None:
+            continue
+        program, external, outputs = built
+        # The fused node reuses the id of the last node in the chain
+        fused_id = component[-1]
+        for node_id in component:
+            del fused[node_id]
+        inputs = {"program": json.dumps(program)}
+        inputs.update((f"x{k}", list(link)) for k, link in enumerate(external))
+        fused[fused_id] = {"class_type": "FusedMath", "inputs": inputs, "_meta": {"title": f"Fused Math ({len(component)} nodes)"}}
+        for output_index, node_id in enumerate(outputs):
+            for consumer, name in consumers[node_id]:
+                if consumer in fused and consumer not in component:
+                    fused[consumer]["inputs"][name] = [fused_id, output_index]
+    return fused, len(prompt) - len(fused)
+
+def may_be_latent(value, prompt):
+    """Whether an input may hold a LATENT at run time: a link to anything but a scalar node."""
+    return is_link(value) and prompt.get(value[0], {}).get("class_type") not in SCALAR_NODES
+
+def canonical_key(node, canonical, prompt):
+    """
+    Key equal for nodes that compute the same value: class, literal inputs by fingerprint and
+    links by the node they resolve to. A commutative operation's operands are keyed unordered,
+    except where both may be LATENTs: the result keeps the first one's other keys.
+    """
+    inputs = {}
+    for name, value in node.get("inputs", {}).items():
+        if is_link(value):
+            inputs[name] = ("link", canonical.get(value[0], value[0]), value[1])
+        else:
+            inputs[name] = fingerprint(value)
+    table = OPERATION_TABLES.get(node["class_type"], {})
+    operation = node.get("inputs", {}).get("operation")
+    if isinstance(operation, str) and operation in table and table[operation].commutative and "a" in inputs and "b" in inputs:
+        latent = node["class_type"] in LATENT_NODES and all(may_be_latent(node["inputs"][name], prompt) for name in ("a", "b"))
+        if not latent:
+            inputs["a"], inputs["b"] = sorted((inputs["a"], inputs["b"]), key=repr)
+    return (node["class_type"], tuple(sorted(inputs.items())))
+
+def eliminate_common_subexpressions(prompt):
+    """
+    Merge pure nodes that compute the same value from the same inputs into the first of
+    them and rewire consumers of the others to it. Merging is repeated down the graph, so
+    duplicate chains collapse whole. Returns (new prompt, number of node executions saved).
+    """
+    canonical = {}
+    first = {}
+    for node_id in topological_order(prompt):
+        node = prompt[node_id]
+        if node.get("class_type") not in PURE_NODES:
+            continue
+        key = canonical_key(node, canonical, prompt)
+        if key in first:
+            canonical[node_id] = first[key]
+        else:
+            first[key] = node_id
+    merged = copy_prompt(prompt)
+    for node_id in canonical:
+        del merged[node_id]
+    for node in merged.values():
+        inputs = node["inputs"]
+        for name, value in inputs.items():
+            if is_link(value) and value[0] in canonical:
+                inputs[name] = [canonical[value[0]], value[1]]
+    return merged, len(prompt) - len(merged)
+
+
+PROMPT_PASSES = {
+    "cse": eliminate_common_subexpressions,
+    "fold": fold_constants,
+    "fuse": fuse_math_chains,
+}
+
+def enabled_passes():
+    """(name, pass) for each pass named in BASIC_MATH_PROMPT_PASSES, in order."""
+    names = [name.strip() for name in os.environ.get(PROMPT_PASSES_ENV, "").split(",") if name.strip()]
+    return [(name, PROMPT_PASSES[name]) for name in names if name in PROMPT_PASSES]
+
+def on_prompt(json_data):
+    """
+    Handler for PromptServer.add_on_prompt_handler: runs the passes named in
+    BASIC_MATH_PROMPT_PASSES over the submitted prompt.
+    """
+    prompt = json_data.get("prompt")
+    if not isinstance(prompt, dict):
+        return json_data
+    for name, prompt_pass in enabled_passes():
+        prompt, saved = prompt_pass(prompt)
+        logging.info(f"Basic Math {name}: {saved} node executions saved")
+    json_data["prompt"] = prompt
+    return json_data
+
+def register_prompt_handler():
+    """Install on_prompt in a running ComfyUI server when any pass is enabled."""
+    if not enabled_passes():
+        return False
+    try:
+        from server import PromptServer
+        PromptServer.instance.add_on_prompt_handler(on_prompt)
+    except (ImportError, AttributeError):
+        return False
+    return True
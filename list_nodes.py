@@ -0,0 +1,831 @@
+import itertools
+from functools import lru_cache
+
+from .tools import VariantSupport, SmartType, any_type
+from .base_node import ListNode
+from .math_nodes import NUMBER, NUMBER_ARRAY, as_float
+from .sequences import NumberSequence, NumberArray, expand_sequence, pack
+from .registry import display_names
+from .schedules import INTERPOLATIONS, parse_schedule
+from . import offload
+from .operators import (
+    BASIC_MATH_OPS, INT_MATH_OPS, UNARY_MATH_OPS, COMPARISON_OPS, STRING_COMPARISON_OPS, BOOLEAN_LOGIC_OPS, REDUCE_OPS,
+    ROUND_METHODS, REGEX_OPERATION, regex_match, regex_matcher,
+)
+
+@lru_cache(maxsize=None)
+def numpy_module():
+    """NumPy, imported on the first batch that could use it, or None if it isn't installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Operations whose float results NumPy reproduces exactly (after the fix-ups below).
+# "**" and the transcendental functions are left to Python: NumPy's SIMD kernels can
+# differ from libm's in the last bit.
+NUMPY_BASIC_MATH_OPERATIONS = {"+", "-", "*", "/", "//", "%", "min", "max"}
+NUMPY_INT_MATH_OPERATIONS = {"min", "max", "&", "|", "^"}
+NUMPY_UNARY_MATH_OPERATIONS = {"abs", "neg", "sqrt", "floor", "ceil", "round"}
+# Sums, means and variances stay on math.fsum: NumPy's pairwise summation isn't correctly rounded
+NUMPY_REDUCE_OPERATIONS = {"min", "max", "argmin", "argmax"}
+
+# List inputs also take a whole NUMBER_SEQUENCE or NUMBER_ARRAY, read without building a list first
+NUMBER_OR_SEQUENCE = SmartType("INT,FLOAT,NUMBER_SEQUENCE,NUMBER_ARRAY")
+INT_OR_SEQUENCE = SmartType("INT,NUMBER_SEQUENCE,NUMBER_ARRAY")
+
+
+def broadcast_length(*lists):
+    """
+    Number of elements a batch produces. Like ComfyUI's own list mapping, shorter lists
+    repeat their last element, and an empty input yields an empty batch.
+    """
+    if any(len(x) == 0 for x in lists):
+        return 0
+    return max(len(x) for x in lists)
+
+def broadcast(values, length):
+    """Extend values to length by repeating its last element."""
+    if len(values) >= length:
+        return values
+    return list(values) + [values[-1]] * (length - len(values))
+
+def all_float(values):
+    if isinstance(values, NumberSequence):
+        return values.is_float
+    # map(type) keeps the scan in C; float subclasses take the exact Python path
+    return set(map(type, values)) <= {float}
+
+def as_float_array(values, length):
+    """Convert values to a float64 array that broadcasts to length, or None if NumPy can't hold them."""
+    np = numpy_module()
+    if isinstance(values, NumberSequence) and len(values) == length:
+        try:
+            return values.to_array(np)
+        except (OverflowError, TypeError, ValueError):
+            return None
+    if len(values) != 1:
+        values = broadcast(values, length)
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+def as_int_array(values, length):
+    """Convert values to an int64 array that broadcasts to length, or None if they don't fit."""
+    np = numpy_module()
+    # int64 would truncate floats and turn bools into ints
+    if isinstance(values, NumberSequence):
+        if values.is_float:
+            return None
+        if len(values) == length:
+            try:
+                return values.to_int_array(np)
+            except (OverflowError, TypeError, ValueError):
+                return None
+    elif not set(map(type, values)) <= {int}:
+        return None
+    if len(values) != 1:
+        values = broadcast(values, length)
+    try:
+        return np.asarray(values, dtype=np.int64)
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+def convert_batch(values, convert, fallback):
+    """
+    convert applied to every value, and a mask of which conversions succeeded; failures give
+    fallback. The whole list is converted in one pass, and again one by one only if that fails.
+    """
+    try:
+        return list(map(convert, values)), [True] * len(values)
+    except Exception:
+        pass
+    results = []
+    succeeded = []
+    for x in values:
+        try:
+            results.append(convert(x))
+            succeeded.append(True)
+        except Exception:
+            results.append(fallback)
+            succeeded.append(False)
+    return results, succeeded
+
+def float_converter(values):
+    """float itself, a C call per value, when it reads values exactly as as_float would."""
+    return float if set(map(type, values)) <= {int, float, str} else as_float
+
+def as_exact_arrays(*lists, length):
+    """
+    The lists as float64 arrays if all are floats, as int64 arrays if all are ints that fit,
+    otherwise None. Comparing a float with an int is exact in Python but not once both are float64.
+    """
+    if numpy_module() is None:
+        return None
+    if all(all_float(values) for values in lists):
+        arrays = [as_float_array(values, length) for values in lists]
+    else:
+        arrays = [as_int_array(values, length) for values in lists]
+    if any(array is None for array in arrays):
+        return None
+    return arrays
+
+def basic_math_numpy(a, b, operation):
+    np = numpy_module()
+    with np.errstate(all="ignore"):
+        if operation == "+":
+            result = a + b
+        elif operation == "-":
+            result = a - b
+        elif operation == "*":
+            result = a * b
+        elif operation == "/":
+            result = np.where(b == 0, np.where(a > 0, np.inf, -np.inf), a / b)
+        elif operation == "//":
+            result = np.where(b == 0, np.where(a > 0, np.inf, -np.inf), np.floor_divide(a, b))
+        elif operation == "%":
+            result = np.where(b == 0, np.nan, np.mod(a, b))
+        elif operation == "min":
+            result = np.where(b < a, b, a)
+        elif operation == "max":
+            result = np.where(b > a, b, a)
+    return result
+
+def basic_math_vectorized(a, b, operation, length):
+    """Basic Math over a and b broadcast to length as a NumPy array, or None if it can't be vectorized exactly."""
+    # Any float operand makes the result a float, so an all-float side can be vectorized
+    if operation in NUMPY_BASIC_MATH_OPERATIONS and (all_float(a) or all_float(b)) and numpy_module() is not None:
+        np = numpy_module()
+        x = as_float_array(a, length)
+        y = as_float_array(b, length)
+        if x is not None and y is not None:
+            return np.broadcast_to(basic_math_numpy(x, y, operation), (length,))
+    return None
+
+def int_math_numpy(a, b, operation):
+    np = numpy_module()
+    if operation == "min":
+        return np.where(b < a, b, a)
+    elif operation == "max":
+        return np.where(b > a, b, a)
+    elif operation == "&":
+        return a & b
+    elif operation == "|":
+        return a | b
+    elif operation == "^":
+        return a ^ b
+
+def unary_math_numpy(value, operation):
+    np = numpy_module()
+    with np.errstate(all="ignore"):
+        if operation == "abs":
+            result = np.abs(value)
+        elif operation == "neg":
+            result = -value
+        elif operation == "sqrt":
+            result = np.sqrt(np.abs(value))
+        elif operation in ("floor", "ceil", "round"):
+            rounded = {"floor": np.floor, "ceil": np.ceil, "round": np.round}[operation](value)
+            # The scalar path goes through int, which rejects inf/nan and has no negative zero
+            result = np.where(np.isfinite(value), rounded + 0.0, np.nan)
+    return result
+
+def unary_math_vectorized(value, operation):
+    """Unary Math over value as a NumPy array, or None if it can't be vectorized exactly."""
+    if operation in NUMPY_UNARY_MATH_OPERATIONS and all_float(value) and numpy_module() is not None:
+        x = as_float_array(value, len(value))
+        if x is not None:
+            return unary_math_numpy(x, operation)
+    return None
+
+def reduce_numpy(values, operation):
+    np = numpy_module()
+    # Like the Python reductions, a nan wins min and max, and argmin/argmax point at the first nan
+    if operation == "min":
+        return float(np.min(values))
+    elif operation == "max":
+        return float(np.max(values))
+    elif operation == "argmin":
+        return int(np.argmin(values))
+    elif operation == "argmax":
+        return int(np.argmax(values))
+
+def boolean_logic_numpy(a, b, operation):
+    np = numpy_module()
+    if operation == "AND":
+        return np.logical_and(a, b)
+    elif operation == "OR":
+        return np.logical_or(a, b)
+    elif operation == "XOR":
+        return np.logical_xor(a, b)
+    elif operation == "NAND":
+        return np.logical_not(np.logical_and(a, b))
+    elif operation == "NOR":
+        return np.logical_not(np.logical_or(a, b))
+    elif operation == "XNOR":
+        return np.logical_not(np.logical_xor(a, b))
+
+
+@VariantSupport()
+class BasicMathList(ListNode):
+    """
+    Basic mathematical operations between two lists of numbers, evaluated as one batch.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "b": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "operation": (list(BASIC_MATH_OPS),),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,)
+    RETURN_NAMES = ("NUMBER",)
+    FUNCTION = "calculate"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def calculate(self, a, b, operation):
+        operation = operation[0]
+        a = expand_sequence(a)
+        b = expand_sequence(b)
+        length = broadcast_length(a, b)
+        if length == 0:
+            return ([],)
+
+        result = basic_math_vectorized(a, b, operation, length)
+        if result is not None:
+            return (result.tolist(),)
+
+        # Batches NumPy can't take are computed element by element; large ones go to a worker
+        if offload.enabled() and length >= offload.OFFLOAD_MIN_LENGTH:
+            return offload.call_node(BasicMathList, "calculate", a=a, b=b, operation=[operation])
+
+        a = broadcast(a, length)
+        b = broadcast(b, length)
+        apply = BASIC_MATH_OPS[operation].apply
+        return ([apply(x, y) for x, y in zip(a, b)],)
+
+@VariantSupport()
+class IntMathList(ListNode):
+    """
+    Basic mathematical operations between two lists of integers, evaluated as one batch.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": (INT_OR_SEQUENCE, {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
+                "b": (INT_OR_SEQUENCE, {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
+                "operation": (list(INT_MATH_OPS),),
+            },
+        }
+
+    RETURN_TYPES = ("INT",)
+    RETURN_NAMES = ("INT",)
+    FUNCTION = "calculate"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def calculate(self, a, b, operation):
+        operation = operation[0]
+        a = expand_sequence(a)
+        b = expand_sequence(b)
+        length = broadcast_length(a, b)
+        if length == 0:
+            return ([],)
+
+        # Only operations that cannot overflow int64 are vectorized; the rest need Python's big ints
+        if operation in NUMPY_INT_MATH_OPERATIONS and numpy_module() is not None:
+            np = numpy_module()
+            x = as_int_array(a, length)
+            y = as_int_array(b, length)
+            if x is not None and y is not None:
+                result = int_math_numpy(x, y, operation)
+                return (np.broadcast_to(result, (length,)).tolist(),)
+
+        # Batches NumPy can't take are computed element by element; large ones go to a worker
+        if offload.enabled() and length >= offload.OFFLOAD_MIN_LENGTH:
+            return offload.call_node(IntMathList, "calculate", a=a, b=b, operation=[operation])
+
+        a = broadcast(a, length)
+        b = broadcast(b, length)
+        apply = INT_MATH_OPS[operation].apply
+        return ([apply(x, y) for x, y in zip(a, b)],)
+
+@VariantSupport()
+class UnaryMathList(ListNode):
+    """
+    Unary mathematical operations on a list of numbers, evaluated as one batch.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "value": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "operation": (list(UNARY_MATH_OPS),),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,)
+    RETURN_NAMES = ("NUMBER",)
+    FUNCTION = "calculate"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def calculate(self, value, operation):
+        operation = operation[0]
+        value = expand_sequence(value)
+        if len(value) == 0:
+            return ([],)
+
+        result = unary_math_vectorized(value, operation)
+        if result is not None:
+            return (result.tolist(),)
+
+        # Batches NumPy can't take are computed element by element; large ones go to a worker
+        if offload.enabled() and len(value) >= offload.OFFLOAD_MIN_LENGTH:
+            return offload.call_node(UnaryMathList, "calculate", value=value, operation=[operation])
+
+        apply = UNARY_MATH_OPS[operation].apply
+        return ([apply(x) for x in value],)
+
+@VariantSupport()
+class StringComparisonList(ListNode):
+    """
+    Compare a list of strings against one string or pattern, or a list of them, as one batch.
+    A single regular expression is compiled once for the whole batch.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": ("STRING", {"multiline": False}),
+                "b": ("STRING", {"multiline": False}),
+                "operation": (list(STRING_COMPARISON_OPS),),
+                "case_sensitive": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN",)
+    RETURN_NAMES = ("BOOLEAN",)
+    FUNCTION = "compare"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def compare(self, a, b, operation, case_sensitive):
+        operation = operation[0]
+        case_sensitive = case_sensitive[0]
+        length = broadcast_length(a, b)
+        if length == 0:
+            return ([],)
+
+        if operation == REGEX_OPERATION:
+            if len(b) == 1:
+                match = regex_matcher(b[0], case_sensitive)
+                return ([match(x) for x in broadcast(a, length)],)
+            return ([regex_match(x, y, case_sensitive) for x, y in zip(broadcast(a, length), broadcast(b, length))],)
+
+        if not case_sensitive:
+            a = [x.lower() for x in a]
+            b = [x.lower() for x in b]
+        func = STRING_COMPARISON_OPS[operation].func
+        return ([func(x, y) for x, y in zip(broadcast(a, length), broadcast(b, length))],)
+
+@VariantSupport()
+class NumberComparisonList(ListNode):
+    """
+    Compare two lists of numbers into a boolean mask, evaluated as one batch.
+    A tolerance makes == and != compare within it, as in Float Comparison.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "b": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "operation": (list(COMPARISON_OPS),),
+            },
+            "optional": {
+                "tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.0001}),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN",)
+    RETURN_NAMES = ("MASK",)
+    FUNCTION = "compare"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def compare(self, a, b, operation, tolerance=(0.0,)):
+        operation = operation[0]
+        tolerance = tolerance[0]
+        a = expand_sequence(a)
+        b = expand_sequence(b)
+        length = broadcast_length(a, b)
+        if length == 0:
+            return ([],)
+        within_tolerance = tolerance > 0 and operation in ("==", "!=")
+
+        # Differences of int64 arrays can overflow, so tolerances are only vectorized on floats
+        if not within_tolerance or (all_float(a) and all_float(b)):
+            arrays = as_exact_arrays(a, b, length=length)
+            if arrays is not None:
+                np = numpy_module()
+                x, y = arrays
+                if within_tolerance:
+                    with np.errstate(all="ignore"):
+                        result = np.abs(x - y) <= tolerance
+                    if operation == "!=":
+                        result = ~result
+                else:
+                    # The operator functions compare arrays elementwise
+                    result = COMPARISON_OPS[operation].func(x, y)
+                return (np.broadcast_to(result, (length,)).tolist(),)
+
+        a = broadcast(a, length)
+        b = broadcast(b, length)
+        if within_tolerance:
+            equal = operation == "=="
+            return ([(abs(x - y) <= tolerance) == equal for x, y in zip(a, b)],)
+        func = COMPARISON_OPS[operation].func
+        return ([func(x, y) for x, y in zip(a, b)],)
+
+@VariantSupport()
+class NumberInRangeList(ListNode):
+    """
+    Check a list of numbers against a range, or a list of ranges, into a boolean mask.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "value": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "min_value": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "max_value": (NUMBER_OR_SEQUENCE, {"default": 1.0}),
+                "inclusive": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN",)
+    RETURN_NAMES = ("MASK",)
+    FUNCTION = "check_range"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def check_range(self, value, min_value, max_value, inclusive):
+        inclusive = inclusive[0]
+        value = expand_sequence(value)
+        min_value = expand_sequence(min_value)
+        max_value = expand_sequence(max_value)
+        length = broadcast_length(value, min_value, max_value)
+        if length == 0:
+            return ([],)
+
+        arrays = as_exact_arrays(value, min_value, max_value, length=length)
+        if arrays is not None:
+            np = numpy_module()
+            x, low, high = arrays
+            if inclusive:
+                result = (low <= x) & (x <= high)
+            else:
+                result = (low < x) & (x < high)
+            return (np.broadcast_to(result, (length,)).tolist(),)
+
+        ranges = zip(broadcast(value, length), broadcast(min_value, length), broadcast(max_value, length))
+        if inclusive:
+            return ([low <= x <= high for x, low, high in ranges],)
+        return ([low < x < high for x, low, high in ranges],)
+
+@VariantSupport()
+class BooleanLogicList(ListNode):
+    """
+    Boolean logic between two lists of booleans, evaluated as one batch.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": ("BOOLEAN",),
+                "b": ("BOOLEAN",),
+                "operation": (list(BOOLEAN_LOGIC_OPS),),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN",)
+    RETURN_NAMES = ("MASK",)
+    FUNCTION = "logic_operation"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def logic_operation(self, a, b, operation):
+        operation = operation[0]
+        length = broadcast_length(a, b)
+        if length == 0:
+            return ([],)
+
+        # AND and OR return one of their operands, so only true bools are vectorized
+        if numpy_module() is not None and set(map(type, itertools.chain(a, b))) <= {bool}:
+            np = numpy_module()
+            a, b = (np.asarray(x if len(x) == 1 else broadcast(x, length), dtype=bool) for x in (a, b))
+            return (np.broadcast_to(boolean_logic_numpy(a, b, operation), (length,)).tolist(),)
+
+        func = BOOLEAN_LOGIC_OPS[operation].func
+        return ([func(x, y) for x, y in zip(broadcast(a, length), broadcast(b, length))],)
+
+@VariantSupport()
+class FilterByMask(ListNode):
+    """
+    Split a list by a boolean mask: values where the mask is true, and values where it is false.
+    A shorter mask repeats its last element.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "values": (any_type,),
+                "mask": ("BOOLEAN",),
+            },
+        }
+
+    RETURN_TYPES = (any_type, any_type)
+    RETURN_NAMES = ("SELECTED", "REJECTED")
+    FUNCTION = "filter"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True, True)
+
+    def filter(self, values, mask):
+        values = expand_sequence(values)
+        length = broadcast_length(values, mask)
+        if length == 0:
+            return ([], [])
+        mask = [bool(x) for x in broadcast(mask, length)]
+        values = broadcast(values, length)
+        selected = list(itertools.compress(values, mask))
+        rejected = list(itertools.compress(values, [not x for x in mask]))
+        return (selected, rejected)
+
+@VariantSupport()
+class ToIntList(ListNode):
+    """
+    Convert a list of values to integers as To Int does, in one batch.
+    OK is false where a value could not be converted, and its INT is 0.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "any": (any_type,),
+            },
+            "optional": {
+                "round_method": (list(ROUND_METHODS), {"default": "round"}),
+            },
+        }
+
+    RETURN_TYPES = ("INT", "BOOLEAN")
+    RETURN_NAMES = ("INT", "OK")
+    FUNCTION = "convert"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True, True)
+
+    def convert(self, any, round_method=("round",)):
+        values = expand_sequence(any)
+        floats, parsed = convert_batch(values, float_converter(values), 0.0)
+        # nan and inf parse but don't round
+        ints, rounded = convert_batch(floats, ROUND_METHODS[round_method[0]], 0)
+        return (ints, [x and y for x, y in zip(parsed, rounded)])
+
+@VariantSupport()
+class ToFloatList(ListNode):
+    """
+    Convert a list of values to floats as To Float does, in one batch.
+    OK is false where a value could not be converted, and its FLOAT is 0.0.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "any": (any_type,),
+            },
+        }
+
+    RETURN_TYPES = ("FLOAT", "BOOLEAN")
+    RETURN_NAMES = ("FLOAT", "OK")
+    FUNCTION = "convert"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True, True)
+
+    def convert(self, any):
+        values = expand_sequence(any)
+        return convert_batch(values, float_converter(values), 0.0)
+
+@VariantSupport()
+class ToBoolList(ListNode):
+    """
+    Convert a list of values to booleans as To Bool does, in one batch.
+    OK is false where a value has no truth value, and its BOOLEAN is true (before invert).
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "any": (any_type,),
+            },
+            "optional": {
+                "invert": ("BOOLEAN", {"default": False}),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN", "BOOLEAN")
+    RETURN_NAMES = ("BOOLEAN", "OK")
+    FUNCTION = "convert"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True, True)
+
+    def convert(self, any, invert=(False,)):
+        results, succeeded = convert_batch(expand_sequence(any), bool, True)
+        if invert[0]:
+            results = [not x for x in results]
+        return (results, succeeded)
+
+@VariantSupport()
+class NumberReduce(ListNode):
+    """
+    Reduce a list of numbers to one number. Like Basic Math, the result is an integer when
+    every value is one, except for mean, variance and stdev, which are always floats.
+    An empty list gives 0 for sum, 1 for product, -1 for argmin/argmax and nan otherwise.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "values": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+                "operation": (list(REDUCE_OPS),),
+            },
+            "optional": {
+                "percentile": ("FLOAT", {"default": 50.0, "min": 0.0, "max": 100.0, "step": 0.1}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,)
+    RETURN_NAMES = ("NUMBER",)
+    FUNCTION = "reduce"
+    INPUT_IS_LIST = True
+
+    def reduce(self, values, operation, percentile=(50.0,)):
+        operation = operation[0]
+        values = expand_sequence(values)
+
+        if operation in NUMPY_REDUCE_OPERATIONS and len(values) > 0 and all_float(values) and numpy_module() is not None:
+            x = as_float_array(values, len(values))
+            if x is not None:
+                return (reduce_numpy(x, operation),)
+
+        func = REDUCE_OPS[operation].func
+        if operation == "percentile":
+            return (func(values, percentile[0]),)
+        return (func(values),)
+
+@VariantSupport()
+class ScheduleValueList(ListNode):
+    """
+    The values of a keyframe schedule at a list of frames, looked up as one batch.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "schedule": ("STRING", {"default": "0:(0.0), 24:(1.0)", "multiline": True}),
+                "frames": (INT_OR_SEQUENCE, {"default": 0, "min": -0xffffffff, "max": 0xffffffff, "step": 1}),
+                "interpolation": (INTERPOLATIONS, {"default": "linear"}),
+            },
+        }
+
+    RETURN_TYPES = ("FLOAT",)
+    RETURN_NAMES = ("FLOAT",)
+    FUNCTION = "evaluate"
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+
+    def evaluate(self, schedule, frames, interpolation):
+        frames = expand_sequence(frames)
+        result = parse_schedule(schedule[0]).values_at(frames, interpolation[0], numpy_module())
+        return (result.tolist() if hasattr(result, "tolist") else result,)
+
+@VariantSupport()
+class ListToArray(ListNode):
+    """
+    Pack a list of numbers, or a sequence, into a NUMBER_ARRAY: int64 if every value is an
+    integer, float64 otherwise.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "values": (NUMBER_OR_SEQUENCE, {"default": 0.0}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER_ARRAY,)
+    RETURN_NAMES = ("ARRAY",)
+    FUNCTION = "pack"
+    INPUT_IS_LIST = True
+
+    def pack(self, values):
+        values = expand_sequence(values)
+        if isinstance(values, NumberArray):
+            return (values,)
+        # Float sequences are generated straight into the array's buffer
+        if isinstance(values, NumberSequence) and values.is_float and numpy_module() is not None:
+            return (pack(values.to_array(numpy_module())),)
+        return (pack(list(values)),)
+
+@VariantSupport()
+class ArrayToList(ListNode):
+    """
+    Unpack a NUMBER_ARRAY into a list, so nodes such as Basic Math run once per value.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "array": (NUMBER_ARRAY,),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,)
+    RETURN_NAMES = ("NUMBER",)
+    FUNCTION = "unpack"
+    OUTPUT_IS_LIST = (True,)
+
+    def unpack(self, array):
+        return (array.tolist(),)
+
+LIST_NODE_CLASS_MAPPINGS = {
+    "BasicMathList": BasicMathList,
+    "IntMathList": IntMathList,
+    "UnaryMathList": UnaryMathList,
+    "StringComparisonList": StringComparisonList,
+    "NumberComparisonList": NumberComparisonList,
+    "NumberInRangeList": NumberInRangeList,
+    "BooleanLogicList": BooleanLogicList,
+    "FilterByMask": FilterByMask,
+    "ToIntList": ToIntList,
+    "ToFloatList": ToFloatList,
+    "ToBoolList": ToBoolList,
+    "NumberReduce": NumberReduce,
+    "ScheduleValueList": ScheduleValueList,
+    "ListToArray": ListToArray,
+    "ArrayToList": ArrayToList,
+}
+
+LIST_NODE_DISPLAY_NAME_MAPPINGS = display_names("list_nodes")
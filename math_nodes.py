@@ -1,11 +1,31 @@
-import math
-import re
 from .tools import VariantSupport, SmartType, ByPassTypeTuple, any_type
-from .base_node import NODE_POSTFIX, ArithmeticNode, BooleanNode, ConversionNode, UtilityNode, ConstantsNode, PrimitiveNode
+from .profiling import swallowed
+from .registry import display_names
+from .base_node import ArithmeticNode, BooleanNode, ConversionNode, UtilityNode, ConstantsNode, PrimitiveNode
+from .operators import (
+    BASIC_MATH_OPS, INT_MATH_OPS, UNARY_MATH_OPS, COMPARISON_OPS, STRING_COMPARISON_OPS,
+    BOOLEAN_LOGIC_OPS, BOOLEAN_UNARY_OPS, VARIADIC_LOGIC_OPS, SHORT_CIRCUIT_OPS, needs_b, ROUND_METHODS, MATH_CONSTANTS, REGEX_OPERATION, POW_MOD_OPERATION, clamp, lerp, regex_match,
+    int_pow_mod, int_math_wrapped, select_operations, estimated_bits, within_int_limit,
+)
+from .expression import compile_expression
+from .fusion import MAX_FUSED_INPUTS, compile_program
+from . import array_ops, offload, tensor_ops
+from .array_ops import has_array
+from .tensor_ops import SCALAR_TYPES, has_tensor
 
 # Create a NUMBER type that accepts both INT and FLOAT
 NUMBER = SmartType("INT,FLOAT")
 ANY=SmartType("INT,FLOAT,STRING,BOOLEAN")
+# Numbers packed in one buffer (sequences.NumberArray), passed between nodes without copying
+NUMBER_ARRAY = "NUMBER_ARRAY"
+# Numbers, or torch tensors and number arrays the arithmetic nodes apply elementwise
+NUMBER_OR_TENSOR = SmartType("INT,FLOAT,IMAGE,MASK,LATENT,NUMBER_ARRAY")
+# Output of the Tensor variants, which only link to inputs that take tensors or number arrays
+TENSOR = SmartType("IMAGE,MASK,LATENT,NUMBER_ARRAY")
+# Inputs of Select By Index
+SELECT_INPUTS = 8
+# Inputs of Boolean Logic (Multiple Inputs)
+LOGIC_INPUTS = 8
 
 @VariantSupport()
 class IntegerInput(PrimitiveNode):
@@ -123,6 +143,17 @@ class StringInput(PrimitiveNode):
         return (value,)
 
 
+def as_float(value):
+    """
+    value as a float, the way the conversion nodes read it: numbers directly, single-element
+    tensors and NumPy scalars through item(), and anything else by parsing its string form.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if hasattr(value, "item"):
+        return float(value.item())
+    return float(str(value))
+
 @VariantSupport()
 class ToInt(ConversionNode):
     """
@@ -138,7 +169,7 @@ class ToInt(ConversionNode):
                 "any": (any_type,),
             },
             "optional": {
-                "round_method": (["round", "floor", "ceil", "trunc"], {"default": "round"}),
+                "round_method": (list(ROUND_METHODS), {"default": "round"}),
             },
         }
 
@@ -149,20 +180,9 @@ class ToInt(ConversionNode):
     def convert(self, any, round_method="round"):
         try:
             # Try to convert to float first, then to int
-            if isinstance(any, (int, float)):
-                float_val = float(any)
-            else:
-                float_val = float(str(any))
-            
-            if round_method == "round":
-                return (round(float_val),)
-            elif round_method == "floor":
-                return (math.floor(float_val),)
-            elif round_method == "ceil":
-                return (math.ceil(float_val),)
-            elif round_method == "trunc":
-                return (math.trunc(float_val),)
+            return (ROUND_METHODS[round_method](as_float(any)),)
         except:
+            swallowed()
             return (0,)
 
 @VariantSupport()
@@ -187,11 +207,9 @@ class ToFloat(ConversionNode):
 
     def convert(self, any):
         try:
-            if isinstance(any, (int, float)):
-                return (float(any),)
-            else:
-                return (float(str(any)),)
+            return (as_float(any),)
         except:
+            swallowed()
             return (0.0,)
 
 @VariantSupport()
@@ -244,6 +262,7 @@ class ToBool(ConversionNode):
         try:
             result = bool(any)
         except:
+            swallowed()
             # If conversion fails, assume it's something (True)
             result = True
 
@@ -256,6 +275,9 @@ class ToBool(ConversionNode):
 class BasicMath(ArithmeticNode):
     """
     Basic mathematical operations between two numbers.
+    IMAGE, MASK and LATENT inputs are processed elementwise with torch.
+    NUMBER_ARRAY inputs give a NUMBER_ARRAY, computed as one batch. The output is typed NUMBER;
+    the Tensor variant's links to tensor and NUMBER_ARRAY inputs.
     """
     def __init__(self):
         pass
@@ -264,9 +286,9 @@ class BasicMath(ArithmeticNode):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "a": (NUMBER, {"default": 0.0}),
-                "b": (NUMBER, {"default": 0.0}),
-                "operation": (["+", "-", "*", "/", "//", "%", "**", "min", "max"],),
+                "a": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "b": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "operation": (list(BASIC_MATH_OPS),),
             },
         }
 
@@ -276,51 +298,20 @@ class BasicMath(ArithmeticNode):
     OUTPUT_IS_LIST = (False,)
 
     def calculate(self, a, b, operation):
-        # Determine if we should return int or float based on input types and operation
-        is_int_operation = isinstance(a, int) and isinstance(b, int) and operation != "/"
-        
-        try:
-            if operation == "+":
-                result = a + b
-            elif operation == "-":
-                result = a - b
-            elif operation == "*":
-                result = a * b
-            elif operation == "/":
-                if b == 0:
-                    return (float('inf') if a > 0 else float('-inf'),)
-                result = a / b
-                is_int_operation = False  # Division always returns float
-            elif operation == "//":
-                if b == 0:
-                    return (float('inf') if a > 0 else float('-inf'),)
-                result = a // b
-            elif operation == "%":
-                if b == 0:
-                    return (float('nan'),)
-                result = a % b
-            elif operation == "**":
-                result = a ** b
-                # Power can return float even with int inputs
-                if not isinstance(result, int):
-                    is_int_operation = False
-            elif operation == "min":
-                result = min(a, b)
-            elif operation == "max":
-                result = max(a, b)
-            
-            # Return as int if both inputs were int and operation preserves int type
-            if is_int_operation and isinstance(result, (int, float)) and result == int(result):
-                return (int(result),)
-            else:
-                return (float(result),)
-        except:
-            return (float('nan'),)
+        if type(a) in SCALAR_TYPES and type(b) in SCALAR_TYPES:
+            return (BASIC_MATH_OPS[operation].apply(a, b),)
+        if has_tensor(a, b):
+            return (tensor_ops.basic_math(a, b, operation),)
+        if has_array(a, b):
+            return (array_ops.basic_math(a, b, operation),)
+        return (BASIC_MATH_OPS[operation].apply(a, b),)
 
 @VariantSupport()
 class IntMath(ArithmeticNode):
     """
     Basic mathematical operations between two integers.
+    ** and << results larger than BASIC_MATH_INT_MAX_BITS give 0 instead of being computed.
+    pow mod is pow(a, b, modulus). With wrap_64bit, results wrap to unsigned 64 bits like seeds.
     """
     def __init__(self):
         pass
@@ -331,7 +322,11 @@ class IntMath(ArithmeticNode):
             "required": {
                 "a": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
                 "b": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
-                "operation": (["+", "-", "*", "//", "%", "**", "min", "max", "&", "|", "^", "<<", ">>"],),
+                "operation": (list(INT_MATH_OPS) + [POW_MOD_OPERATION],),
+            },
+            "optional": {
+                "modulus": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
+                "wrap_64bit": ("BOOLEAN", {"default": False}),
             },
         }
 
@@ -339,45 +334,29 @@ class IntMath(ArithmeticNode):
     RETURN_NAMES = ("INT",)
     FUNCTION = "calculate"
 
-    def calculate(self, a, b, operation):
-        try:
-            if operation == "+":
-                return (a + b,)
-            elif operation == "-":
-                return (a - b,)
-            elif operation == "*":
-                return (a * b,)
-            elif operation == "//":
-                if b == 0:
-                    return (0,)
-                return (a // b,)
-            elif operation == "%":
-                if b == 0:
-                    return (0,)
-                return (a % b,)
-            elif operation == "**":
-                return (a ** b,)
-            elif operation == "min":
-                return (min(a, b),)
-            elif operation == "max":
-                return (max(a, b),)
-            elif operation == "&":
-                return (a & b,)
-            elif operation == "|":
-                return (a | b,)
-            elif operation == "^":
-                return (a ^ b,)
-            elif operation == "<<":
-                return (a << b,)
-            elif operation == ">>":
-                return (a >> b,)
-        except:
-            return (0,)
+    def calculate(self, a, b, operation, modulus=0, wrap_64bit=False):
+        if operation == POW_MOD_OPERATION:
+            try:
+                result = int_pow_mod(a, b, modulus)
+            except:
+                swallowed()
+                result = 0
+            return (result & 0xffffffffffffffff if wrap_64bit else result,)
+        if wrap_64bit:
+            return (int_math_wrapped(a, b, operation),)
+        if offload.enabled():
+            bits = estimated_bits(a, b, operation)
+            if bits > offload.OFFLOAD_MIN_BITS and within_int_limit(bits):
+                return offload.call_node(IntMath, "calculate", a=a, b=b, operation=operation)
+        return (INT_MATH_OPS[operation].apply(a, b),)
 
 @VariantSupport()
 class UnaryMath(ArithmeticNode):
     """
     Unary mathematical operations on a single number.
+    IMAGE, MASK and LATENT inputs are processed elementwise with torch.
+    NUMBER_ARRAY inputs give a NUMBER_ARRAY, computed as one batch. The output is typed NUMBER;
+    the Tensor variant's links to tensor and NUMBER_ARRAY inputs.
     """
     def __init__(self):
         pass
@@ -386,8 +365,8 @@ class UnaryMath(ArithmeticNode):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "value": (NUMBER, {"default": 0.0}),
-                "operation": (["abs", "neg", "sqrt", "sin", "cos", "tan", "log", "log10", "exp", "floor", "ceil", "round"],),
+                "value": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "operation": (list(UNARY_MATH_OPS),),
             },
         }
 
@@ -397,51 +376,142 @@ class UnaryMath(ArithmeticNode):
     OUTPUT_IS_LIST = (False,)
 
     def calculate(self, value, operation):
-        # Determine return type based on operation and input
-        preserve_int = isinstance(value, int) and operation in ["abs", "neg"]
-        
-        try:
-            if operation == "abs":
-                result = abs(value)
-            elif operation == "neg":
-                result = -value
-            elif operation == "sqrt":
-                result = math.sqrt(abs(value))
-                preserve_int = False
-            elif operation == "sin":
-                result = math.sin(value)
-                preserve_int = False
-            elif operation == "cos":
-                result = math.cos(value)
-                preserve_int = False
-            elif operation == "tan":
-                result = math.tan(value)
-                preserve_int = False
-            elif operation == "log":
-                result = math.log(abs(value)) if value != 0 else float('-inf')
-                preserve_int = False
-            elif operation == "log10":
-                result = math.log10(abs(value)) if value != 0 else float('-inf')
-                preserve_int = False
-            elif operation == "exp":
-                result = math.exp(value)
-                preserve_int = False
-            elif operation == "floor":
-                result = math.floor(value)
-                preserve_int = isinstance(value, int)
-            elif operation == "ceil":
-                result = math.ceil(value)
-                preserve_int = isinstance(value, int)
-            elif operation == "round":
-                result = round(value)
-                preserve_int = isinstance(value, int)
-            
-            if preserve_int:
-                return (int(result),)
-            else:
-                return (float(result),)
-        except:
-            return (float('nan'),)
+        if type(value) in SCALAR_TYPES:
+            return (UNARY_MATH_OPS[operation].apply(value),)
+        if has_tensor(value):
+            return (tensor_ops.unary_math(value, operation),)
+        if has_array(value):
+            return (array_ops.unary_math(value, operation),)
+        return (UNARY_MATH_OPS[operation].apply(value),)
+
+@VariantSupport()
+class BasicMathAll(ArithmeticNode):
+    """
+    Every Basic Math operation between a and b, one output each.
+    operations optionally lists the ones to compute, comma-separated; the other outputs are None.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "b": (NUMBER_OR_TENSOR, {"default": 0.0}),
+            },
+            "optional": {
+                "operations": ("STRING", {"default": "", "multiline": False}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,) * len(BASIC_MATH_OPS)
+    RETURN_NAMES = tuple(BASIC_MATH_OPS)
+    FUNCTION = "calculate"
+
+    def calculate(self, a, b, operations=""):
+        selected = select_operations(BASIC_MATH_OPS, operations)
+        if has_tensor(a, b):
+            return tuple(tensor_ops.basic_math(a, b, name) if name in selected else None for name in BASIC_MATH_OPS)
+        if has_array(a, b):
+            return tuple(array_ops.basic_math(a, b, name) if name in selected else None for name in BASIC_MATH_OPS)
+        return tuple(op.apply(a, b) if name in selected else None for name, op in BASIC_MATH_OPS.items())
+
+@VariantSupport()
+class IntMathAll(ArithmeticNode):
+    """
+    Every Int Math operation between a and b, one output each.
+    operations optionally lists the ones to compute, comma-separated; the other outputs are None.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
+                "b": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
+            },
+            "optional": {
+                "operations": ("STRING", {"default": "", "multiline": False}),
+            },
+        }
+
+    RETURN_TYPES = ("INT",) * len(INT_MATH_OPS)
+    RETURN_NAMES = tuple(INT_MATH_OPS)
+    FUNCTION = "calculate"
+
+    def calculate(self, a, b, operations=""):
+        selected = select_operations(INT_MATH_OPS, operations)
+        return tuple(op.apply(a, b) if name in selected else None for name, op in INT_MATH_OPS.items())
+
+@VariantSupport()
+class UnaryMathAll(ArithmeticNode):
+    """
+    Every Unary Math operation on value, one output each.
+    operations optionally lists the ones to compute, comma-separated; the other outputs are None.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "value": (NUMBER_OR_TENSOR, {"default": 0.0}),
+            },
+            "optional": {
+                "operations": ("STRING", {"default": "", "multiline": False}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,) * len(UNARY_MATH_OPS)
+    RETURN_NAMES = tuple(UNARY_MATH_OPS)
+    FUNCTION = "calculate"
+
+    def calculate(self, value, operations=""):
+        selected = select_operations(UNARY_MATH_OPS, operations)
+        if has_tensor(value):
+            return tuple(tensor_ops.unary_math(value, name) if name in selected else None for name in UNARY_MATH_OPS)
+        if has_array(value):
+            return tuple(array_ops.unary_math(value, name) if name in selected else None for name in UNARY_MATH_OPS)
+        return tuple(op.apply(value) if name in selected else None for name, op in UNARY_MATH_OPS.items())
+
+@VariantSupport()
+class MathExpression(ArithmeticNode):
+    """
+    Evaluate a formula over up to four numbers, e.g. clamp(a*b + sin(c), 0, 1).
+    Operators and functions follow the Basic Math and Unary Math nodes.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "expression": ("STRING", {"default": "a + b", "multiline": False}),
+            },
+            "optional": {
+                "a": (NUMBER, {"default": 0.0}),
+                "b": (NUMBER, {"default": 0.0}),
+                "c": (NUMBER, {"default": 0.0}),
+                "d": (NUMBER, {"default": 0.0}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,)
+    RETURN_NAMES = ("NUMBER",)
+    FUNCTION = "evaluate"
+    OUTPUT_IS_LIST = (False,)
+
+    def evaluate(self, expression, a=0, b=0, c=0, d=0):
+        result = compile_expression(expression)(a, b, c, d)
+        # Comparisons produce booleans; report them as numbers
+        if isinstance(result, bool):
+            return (int(result),)
+        return (result,)
 
 @VariantSupport()
 class MathConstants(ConstantsNode):
@@ -455,7 +525,7 @@ class MathConstants(ConstantsNode):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "constant": (["pi", "e", "tau", "inf", "nan"],),
+                "constant": (list(MATH_CONSTANTS),),
             },
         }
 
@@ -464,16 +534,7 @@ class MathConstants(ConstantsNode):
     FUNCTION = "get_constant"
 
     def get_constant(self, constant):
-        if constant == "pi":
-            return (math.pi,)
-        elif constant == "e":
-            return (math.e,)
-        elif constant == "tau":
-            return (math.tau,)
-        elif constant == "inf":
-            return (float('inf'),)
-        elif constant == "nan":
-            return (float('nan'),)
+        return (MATH_CONSTANTS[constant],)
 
 @VariantSupport()
 class NumberRound(UtilityNode):
@@ -509,6 +570,9 @@ class NumberRound(UtilityNode):
 class NumberClamp(UtilityNode):
     """
     Clamp a number between minimum and maximum values.
+    IMAGE, MASK and LATENT inputs are processed elementwise with torch.
+    NUMBER_ARRAY inputs give a NUMBER_ARRAY, computed as one batch. The output is typed NUMBER;
+    the Tensor variant's links to tensor and NUMBER_ARRAY inputs.
     """
     def __init__(self):
         pass
@@ -517,9 +581,9 @@ class NumberClamp(UtilityNode):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "value": (NUMBER, {"default": 0.0}),
-                "min_value": (NUMBER, {"default": 0.0}),
-                "max_value": (NUMBER, {"default": 1.0}),
+                "value": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "min_value": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "max_value": (NUMBER_OR_TENSOR, {"default": 1.0}),
             },
         }
 
@@ -529,17 +593,21 @@ class NumberClamp(UtilityNode):
     OUTPUT_IS_LIST = (False,)
 
     def clamp(self, value, min_value, max_value):
-        result = max(min_value, min(max_value, value))
-        # If all inputs are int, return int
-        if all(isinstance(x, int) for x in [value, min_value, max_value]):
-            return (int(result),)
-        else:
-            return (float(result),)
+        if type(value) in SCALAR_TYPES and type(min_value) in SCALAR_TYPES and type(max_value) in SCALAR_TYPES:
+            return (clamp(value, min_value, max_value),)
+        if has_tensor(value, min_value, max_value):
+            return (tensor_ops.clamp(value, min_value, max_value),)
+        if has_array(value, min_value, max_value):
+            return (array_ops.clamp(value, min_value, max_value),)
+        return (clamp(value, min_value, max_value),)
 
 @VariantSupport()
 class NumberLerp(UtilityNode):
     """
     Linear interpolation between two values.
+    IMAGE, MASK and LATENT inputs are processed elementwise with torch.
+    NUMBER_ARRAY inputs give a NUMBER_ARRAY, computed as one batch. The output is typed NUMBER;
+    the Tensor variant's links to tensor and NUMBER_ARRAY inputs.
     """
     def __init__(self):
         pass
@@ -548,9 +616,9 @@ class NumberLerp(UtilityNode):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "a": (NUMBER, {"default": 0.0}),
-                "b": (NUMBER, {"default": 1.0}),
-                "t": (NUMBER, {"default": 0.5}),
+                "a": (NUMBER_OR_TENSOR, {"default": 0.0}),
+                "b": (NUMBER_OR_TENSOR, {"default": 1.0}),
+                "t": (NUMBER_OR_TENSOR, {"default": 0.5}),
             },
         }
 
@@ -560,13 +628,84 @@ class NumberLerp(UtilityNode):
     OUTPUT_IS_LIST = (False,)
 
     def lerp(self, a, b, t):
-        result = a + t * (b - a)
-        # Lerp usually returns float due to multiplication
-        # Only return int if result is whole number and inputs were int
-        if all(isinstance(x, int) for x in [a, b, t]) and result == int(result):
-            return (int(result),)
-        else:
-            return (float(result),)
+        if type(a) in SCALAR_TYPES and type(b) in SCALAR_TYPES and type(t) in SCALAR_TYPES:
+            return (lerp(a, b, t),)
+        if has_tensor(a, b, t):
+            return (tensor_ops.lerp(a, b, t),)
+        if has_array(a, b, t):
+            return (array_ops.lerp(a, b, t),)
+        return (lerp(a, b, t),)
+
+def tensor_result(node, result):
+    if type(result) in SCALAR_TYPES:
+        raise ValueError(f"{type(node).__name__} needs an IMAGE, MASK, LATENT or NUMBER_ARRAY input")
+    return (result,)
+
+# The Tensor variants inherit their base node's VariantSupport schema and validation
+
+class BasicMathTensor(BasicMath):
+    """
+    Basic Math with a tensor output, for IMAGE, MASK, LATENT or NUMBER_ARRAY operands.
+    """
+    RETURN_TYPES = (TENSOR,)
+    RETURN_NAMES = ("TENSOR",)
+
+    def calculate(self, a, b, operation):
+        return tensor_result(self, super().calculate(a, b, operation)[0])
+
+class UnaryMathTensor(UnaryMath):
+    """
+    Unary Math with a tensor output, for an IMAGE, MASK, LATENT or NUMBER_ARRAY value.
+    """
+    RETURN_TYPES = (TENSOR,)
+    RETURN_NAMES = ("TENSOR",)
+
+    def calculate(self, value, operation):
+        return tensor_result(self, super().calculate(value, operation)[0])
+
+class NumberClampTensor(NumberClamp):
+    """
+    Number Clamp with a tensor output, for IMAGE, MASK, LATENT or NUMBER_ARRAY operands.
+    """
+    RETURN_TYPES = (TENSOR,)
+    RETURN_NAMES = ("TENSOR",)
+
+    def clamp(self, value, min_value, max_value):
+        return tensor_result(self, super().clamp(value, min_value, max_value)[0])
+
+class NumberLerpTensor(NumberLerp):
+    """
+    Number Lerp with a tensor output, for IMAGE, MASK, LATENT or NUMBER_ARRAY operands.
+    """
+    RETURN_TYPES = (TENSOR,)
+    RETURN_NAMES = ("TENSOR",)
+
+    def lerp(self, a, b, t):
+        return tensor_result(self, super().lerp(a, b, t)[0])
+
+@VariantSupport()
+class FusedMath(UtilityNode):
+    """
+    Run a chain of math nodes compiled into a single function.
+    Created by the "fuse" prompt pass rather than placed by hand.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "program": ("STRING", {"multiline": True}),
+            },
+            "optional": {f"x{k}": (any_type,) for k in range(MAX_FUSED_INPUTS)},
+        }
+
+    RETURN_TYPES = ByPassTypeTuple((any_type,))
+    FUNCTION = "run"
+
+    def run(self, program, **inputs):
+        return compile_program(program, has_tensor(*inputs.values()))(**inputs)
 
 @VariantSupport()
 class NumberInRange(UtilityNode):
@@ -611,7 +750,7 @@ class NumberComparison(BooleanNode):
             "required": {
                 "a": (NUMBER, {"default": 0.0}),
                 "b": (NUMBER, {"default": 0.0}),
-                "operation": (["==", "!=", "<", ">", "<=", ">="],),
+                "operation": (list(COMPARISON_OPS),),
             },
         }
 
@@ -620,18 +759,36 @@ class NumberComparison(BooleanNode):
     FUNCTION = "compare"
 
     def compare(self, a, b, operation):
-        if operation == "==":
-            return (a == b,)
-        elif operation == "!=":
-            return (a != b,)
-        elif operation == "<":
-            return (a < b,)
-        elif operation == ">":
-            return (a > b,)
-        elif operation == "<=":
-            return (a <= b,)
-        elif operation == ">=":
-            return (a >= b,)
+        return (COMPARISON_OPS[operation].func(a, b),)
+
+@VariantSupport()
+class NumberComparisonAll(BooleanNode):
+    """
+    Every comparison between a and b, one output each.
+    operations optionally lists the ones to compute, comma-separated; the other outputs are None.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "a": (NUMBER, {"default": 0.0}),
+                "b": (NUMBER, {"default": 0.0}),
+            },
+            "optional": {
+                "operations": ("STRING", {"default": "", "multiline": False}),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN",) * len(COMPARISON_OPS)
+    RETURN_NAMES = tuple(COMPARISON_OPS)
+    FUNCTION = "compare"
+
+    def compare(self, a, b, operations=""):
+        selected = select_operations(COMPARISON_OPS, operations)
+        return tuple(op.func(a, b) if name in selected else None for name, op in COMPARISON_OPS.items())
 
 @VariantSupport()
 class IntegerComparison(BooleanNode):
@@ -647,7 +804,7 @@ class IntegerComparison(BooleanNode):
             "required": {
                 "a": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
                 "b": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff, "step": 1}),
-                "operation": (["==", "!=", "<", ">", "<=", ">="],),
+                "operation": (list(COMPARISON_OPS),),
             },
         }
 
@@ -656,18 +813,7 @@ class IntegerComparison(BooleanNode):
     FUNCTION = "compare"
 
     def compare(self, a, b, operation):
-        if operation == "==":
-            return (a == b,)
-        elif operation == "!=":
-            return (a != b,)
-        elif operation == "<":
-            return (a < b,)
-        elif operation == ">":
-            return (a > b,)
-        elif operation == "<=":
-            return (a <= b,)
-        elif operation == ">=":
-            return (a >= b,)
+        return (COMPARISON_OPS[operation].func(a, b),)
 
 @VariantSupport()
 class FloatComparison(BooleanNode):
@@ -683,7 +829,7 @@ class FloatComparison(BooleanNode):
             "required": {
                 "a": ("FLOAT", {"default": 0.0, "min": -999999999999.0, "max": 999999999999.0, "step": 0.001}),
                 "b": ("FLOAT", {"default": 0.0, "min": -999999999999.0, "max": 999999999999.0, "step": 0.001}),
-                "operation": (["==", "!=", "<", ">", "<=", ">="],),
+                "operation": (list(COMPARISON_OPS),),
             },
             "optional": {
                 "tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.0001}),
@@ -703,18 +849,7 @@ class FloatComparison(BooleanNode):
             else:  # !=
                 return (not equal,)
         
-        if operation == "==":
-            return (a == b,)
-        elif operation == "!=":
-            return (a != b,)
-        elif operation == "<":
-            return (a < b,)
-        elif operation == ">":
-            return (a > b,)
-        elif operation == "<=":
-            return (a <= b,)
-        elif operation == ">=":
-            return (a >= b,)
+        return (COMPARISON_OPS[operation].func(a, b),)
 
 @VariantSupport()
 class StringComparison(BooleanNode):
@@ -730,7 +865,7 @@ class StringComparison(BooleanNode):
             "required": {
                 "a": ("STRING", {"multiline": False}),
                 "b": ("STRING", {"multiline": False}),
-                "operation": (["a == b", "a != b", "a IN b", "a MATCH REGEX(b)", "a BEGINSWITH b", "a ENDSWITH b"],),
+                "operation": (list(STRING_COMPARISON_OPS),),
                 "case_sensitive": ("BOOLEAN", {"default": True}),
             },
         }
@@ -740,30 +875,21 @@ class StringComparison(BooleanNode):
     FUNCTION = "compare"
 
     def compare(self, a, b, operation, case_sensitive):
+        if operation == REGEX_OPERATION:
+            if offload.enabled() and len(a) >= offload.OFFLOAD_MIN_CHARS:
+                return offload.call_node(StringComparison, "compare", a=a, b=b, operation=operation, case_sensitive=case_sensitive)
+            return (regex_match(a, b, case_sensitive),)
         if not case_sensitive:
             a = a.lower()
             b = b.lower()
 
-        if operation == "a == b":
-            return (a == b,)
-        elif operation == "a != b":
-            return (a != b,)
-        elif operation == "a IN b":
-            return (a in b,)
-        elif operation == "a MATCH REGEX(b)":
-            try:
-                return (re.match(b, a) is not None,)
-            except:
-                return (False,)
-        elif operation == "a BEGINSWITH b":
-            return (a.startswith(b),)
-        elif operation == "a ENDSWITH b":
-            return (a.endswith(b),)
+        return (STRING_COMPARISON_OPS[operation].func(a, b),)
 
 @VariantSupport()
 class BooleanLogic(BooleanNode):
     """
-    Boolean logic operations.
+    Boolean logic operations. Inputs are lazy and short-circuit: b is not requested when a
+    already decides the result (AND, NAND with a false; OR, NOR with a true).
     """
     def __init__(self):
         pass
@@ -772,9 +898,9 @@ class BooleanLogic(BooleanNode):
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "a": ("BOOLEAN",),
-                "b": ("BOOLEAN",),
-                "operation": (["AND", "OR", "XOR", "NAND", "NOR", "XNOR"],),
+                "a": ("BOOLEAN", {"lazy": True}),
+                "b": ("BOOLEAN", {"lazy": True}),
+                "operation": (list(BOOLEAN_LOGIC_OPS),),
             },
         }
 
@@ -782,19 +908,58 @@ class BooleanLogic(BooleanNode):
     RETURN_NAMES = ("BOOLEAN",)
     FUNCTION = "logic_operation"
 
-    def logic_operation(self, a, b, operation):
-        if operation == "AND":
-            return (a and b,)
-        elif operation == "OR":
-            return (a or b,)
-        elif operation == "XOR":
-            return (a ^ b,)
-        elif operation == "NAND":
-            return (not (a and b),)
-        elif operation == "NOR":
-            return (not (a or b),)
-        elif operation == "XNOR":
-            return (not (a ^ b),)
+    def check_lazy_status(self, operation, a=None, b=None):
+        if a is None:
+            return ["a"]
+        return ["b"] if b is None and needs_b(a, operation) else []
+
+    def logic_operation(self, a, b=None, operation="AND"):
+        # A skipped b is None, which the operations never reach
+        return (BOOLEAN_LOGIC_OPS[operation].func(a, b),)
+
+@VariantSupport()
+class BooleanLogicMulti(BooleanNode):
+    """
+    AND or OR over every connected input. Inputs are requested one at a time, in order, and
+    the rest are skipped once one decides the result.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "operation": (list(VARIADIC_LOGIC_OPS),),
+            },
+            "optional": {f"value_{i}": ("BOOLEAN", {"lazy": True, "forceInput": True}) for i in range(LOGIC_INPUTS)},
+        }
+
+    RETURN_TYPES = ("BOOLEAN",)
+    RETURN_NAMES = ("BOOLEAN",)
+    FUNCTION = "logic_operation"
+
+    def check_lazy_status(self, operation, **values):
+        decisive = SHORT_CIRCUIT_OPS[operation]
+        for i in range(LOGIC_INPUTS):
+            value = values.get(f"value_{i}")
+            if value is None:
+                if f"value_{i}" in values:
+                    return [f"value_{i}"]
+            elif bool(value) == decisive:
+                return []
+        return []
+
+    def logic_operation(self, operation, **values):
+        decisive = SHORT_CIRCUIT_OPS[operation]
+        inputs = []
+        for i in range(LOGIC_INPUTS):
+            value = values.get(f"value_{i}")
+            if value is not None:
+                inputs.append(value)
+                if bool(value) == decisive:
+                    break
+        return (VARIADIC_LOGIC_OPS[operation].func(inputs),)
 
 @VariantSupport()
 class BooleanUnary(BooleanNode):
@@ -809,7 +974,7 @@ class BooleanUnary(BooleanNode):
         return {
             "required": {
                 "value": ("BOOLEAN",),
-                "operation": (["NOT", "IDENTITY"],),
+                "operation": (list(BOOLEAN_UNARY_OPS),),
             },
         }
 
@@ -818,10 +983,70 @@ class BooleanUnary(BooleanNode):
     FUNCTION = "unary_operation"
 
     def unary_operation(self, value, operation):
-        if operation == "NOT":
-            return (not value,)
-        elif operation == "IDENTITY":
-            return (value,)
+        return (BOOLEAN_UNARY_OPS[operation].func(value),)
+
+@VariantSupport()
+class IfElse(BooleanNode):
+    """
+    on_true if condition holds, otherwise on_false. Both are lazy: only the chosen branch is
+    requested, so the other one's nodes never run.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "condition": ("BOOLEAN", {"default": True}),
+                "on_true": (any_type, {"lazy": True}),
+                "on_false": (any_type, {"lazy": True}),
+            },
+        }
+
+    RETURN_TYPES = (any_type,)
+    RETURN_NAMES = ("VALUE",)
+    FUNCTION = "switch"
+
+    def check_lazy_status(self, condition, on_true=None, on_false=None):
+        if condition:
+            return ["on_true"] if on_true is None else []
+        return ["on_false"] if on_false is None else []
+
+    def switch(self, condition, on_true=None, on_false=None):
+        return (on_true if condition else on_false,)
+
+@VariantSupport()
+class SelectByIndex(BooleanNode):
+    """
+    The value_<index> input. Inputs are lazy: only the selected one is requested.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "index": ("INT", {"default": 0, "min": 0, "max": SELECT_INPUTS - 1, "step": 1}),
+            },
+            "optional": {f"value_{i}": (any_type, {"lazy": True}) for i in range(SELECT_INPUTS)},
+        }
+
+    RETURN_TYPES = (any_type,)
+    RETURN_NAMES = ("VALUE",)
+    FUNCTION = "select"
+
+    def check_lazy_status(self, index, **values):
+        name = f"value_{index}"
+        # Unconnected inputs are absent; select reports those
+        return [name] if name in values and values[name] is None else []
+
+    def select(self, index, **values):
+        name = f"value_{index}"
+        if name not in values:
+            raise ValueError(f"Selected input {name} is not connected")
+        return (values[name],)
 
 MATH_NODE_CLASS_MAPPINGS = {
     "IntegerInput": IntegerInput,
@@ -836,41 +1061,30 @@ MATH_NODE_CLASS_MAPPINGS = {
     "BasicMath": BasicMath,
     "IntMath": IntMath,
     "UnaryMath": UnaryMath,
+    "BasicMathAll": BasicMathAll,
+    "IntMathAll": IntMathAll,
+    "UnaryMathAll": UnaryMathAll,
+    "MathExpression": MathExpression,
     "MathConstants": MathConstants,
     "NumberRound": NumberRound,
     "NumberClamp": NumberClamp,
     "NumberLerp": NumberLerp,
+    "BasicMathTensor": BasicMathTensor,
+    "UnaryMathTensor": UnaryMathTensor,
+    "NumberClampTensor": NumberClampTensor,
+    "NumberLerpTensor": NumberLerpTensor,
+    "FusedMath": FusedMath,
     "NumberInRange": NumberInRange,
     "NumberComparison": NumberComparison,
+    "NumberComparisonAll": NumberComparisonAll,
     "IntegerComparison": IntegerComparison,
     "FloatComparison": FloatComparison,
     "StringComparison": StringComparison,
     "BooleanLogic": BooleanLogic,
+    "BooleanLogicMulti": BooleanLogicMulti,
     "BooleanUnary": BooleanUnary,
+    "IfElse": IfElse,
+    "SelectByIndex": SelectByIndex,
 }
 
-MATH_NODE_DISPLAY_NAME_MAPPINGS = {
-    "IntegerInput": f"Integer {NODE_POSTFIX}",
-    "FloatInput": f"Float {NODE_POSTFIX}",
-    "PreciseFloatInput": f"Precise Float {NODE_POSTFIX}",
-    "BooleanInput": f"Boolean {NODE_POSTFIX}",
-    "StringInput": f"String {NODE_POSTFIX}",
-    "ToInt": f"To Int {NODE_POSTFIX}",
-    "ToFloat": f"To Float {NODE_POSTFIX}",
-    "ToString": f"To String {NODE_POSTFIX}",
-    "ToBool": f"To Bool {NODE_POSTFIX}",
-    "BasicMath": f"Basic Math {NODE_POSTFIX}",
-    "IntMath": f"Int Math {NODE_POSTFIX}",
-    "UnaryMath": f"Unary Math {NODE_POSTFIX}",
-    "MathConstants": f"Math Constants {NODE_POSTFIX}",
-    "NumberRound": f"Number Round {NODE_POSTFIX}",
-    "NumberClamp": f"Number Clamp {NODE_POSTFIX}",
-    "NumberLerp": f"Number Lerp {NODE_POSTFIX}",
-    "NumberInRange": f"Number In Range {NODE_POSTFIX}",
-    "NumberComparison": f"Number Comparison {NODE_POSTFIX}",
-    "IntegerComparison": f"Integer Comparison {NODE_POSTFIX}",
-    "FloatComparison": f"Float Comparison {NODE_POSTFIX}",
-    "StringComparison": f"String Comparison {NODE_POSTFIX}",
-    "BooleanLogic": f"Boolean Logic {NODE_POSTFIX}",
-    "BooleanUnary": f"Boolean Unary {NODE_POSTFIX}",
-}
\ No newline at end of file
+MATH_NODE_DISPLAY_NAME_MAPPINGS = display_names("math_nodes")
@@ -0,0 +1,129 @@
+"""
+Optional process-pool backend for node calls too expensive to run on ComfyUI's executor
+thread. A node whose estimated cost is over a threshold hands its whole call to a worker
+process and returns the worker's result tuple unchanged. Calls that run past the timeout,
+or are interrupted from ComfyUI, terminate the workers; the pool is rebuilt on next use.
+"""
+import atexit
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+from .tools import env_int
+
+# Set to 1 to offload expensive calls to worker processes
+OFFLOAD_ENV = "BASIC_MATH_OFFLOAD"
+OFFLOAD_WORKERS = env_int("BASIC_MATH_OFFLOAD_WORKERS", 2)
+# Seconds an offloaded call may take before its workers are terminated
+OFFLOAD_TIMEOUT = env_int("BASIC_MATH_OFFLOAD_TIMEOUT", 60)
+
+OFFLOAD_ENABLED = os.environ.get(OFFLOAD_ENV, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+# Cost thresholds above which a call is worth the round trip to a worker (about a millisecond)
+OFFLOAD_MIN_BITS = 1 << 20
+OFFLOAD_MIN_CHARS = 1 << 16
+OFFLOAD_MIN_LENGTH = 1 << 18
+
+# Seconds between checks for a ComfyUI interrupt while waiting on a worker
+POLL_INTERVAL = 0.1
+
+# Run by exec in each new worker. The package is usually loaded from a path under a name
+# that can't be imported, so it is registered by directory, without running __init__, so
+# that pickled references to its functions resolve. Workers never offload in turn.
+BOOTSTRAP = """
+import os, sys, types
+os.environ[{env!r}] = "0"
+parts = {name!r}.split(".")
+for i in range(1, len(parts) + 1):
+    name = ".".join(parts[:i])
+    if name not in sys.modules:
+        module = types.ModuleType(name)
+        module.__path__ = [{path!r}] if i == len(parts) else []
+        sys.modules[name] = module
+"""
+
+_lock = threading.Lock()
+_executor = None
+
+
+def enabled():
+    return OFFLOAD_ENABLED
+
+def executor():
+    """The shared pool, started on first use. Workers are spawned, never forked, to stay CUDA-safe."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            bootstrap = BOOTSTRAP.format(env=OFFLOAD_ENV, name=__package__, path=os.path.dirname(os.path.abspath(__file__)))
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, OFFLOAD_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=builtins.exec,
+                initargs=(bootstrap, {}),
+            )
+        return _executor
+
+@contextmanager
+def hidden_main():
+    """
+    Spawned workers re-run the parent's main module, which for ComfyUI is main.py. The pool
+    only spawns workers inside submit, so submitting with a stand-in __main__ keeps them from it.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+def shutdown(terminate=False):
+    """Stop the pool; with terminate, kill workers mid-call instead of letting them finish."""
+    global _executor
+    with _lock:
+        pool, _executor = _executor, None
+    if pool is None:
+        return
+    if terminate:
+        terminate_workers = getattr(pool, "terminate_workers", None)
+        if terminate_workers is not None:
+            terminate_workers()
+            return
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=not terminate, cancel_futures=True)
+
+atexit.register(shutdown, terminate=True)
+
+def run_node(module_name, class_name, function, kwargs):
+    node_class = getattr(importlib.import_module(module_name), class_name)
+    return getattr(node_class(), function)(**kwargs)
+
+def call_node(node_class, function, **kwargs):
+    """node_class().function(**kwargs), computed in a worker process."""
+    from concurrent.futures import TimeoutError as FutureTimeout
+    pool = executor()
+    with hidden_main():
+        future = pool.submit(run_node, node_class.__module__, node_class.__name__, function, kwargs)
+    deadline = time.monotonic() + OFFLOAD_TIMEOUT
+    while True:
+        try:
+            return future.result(timeout=POLL_INTERVAL)
+        except FutureTimeout:
+            pass
+        # Only imported by ComfyUI itself; standalone use has nothing to interrupt
+        model_management = sys.modules.get("comfy.model_management")
+        if model_management is not None and model_management.processing_interrupted():
+            future.cancel()
+            shutdown(terminate=True)
+            model_management.throw_exception_if_processing_interrupted()
+        if time.monotonic() > deadline:
+            future.cancel()
+            shutdown(terminate=True)
+            raise TimeoutError(f"{node_class.__name__} took longer than BASIC_MATH_OFFLOAD_TIMEOUT={OFFLOAD_TIMEOUT}s and was stopped")
@@ -0,0 +1,469 @@
+import math
+import operator
+import re
+from functools import lru_cache
+
+from .tools import env_int
+from .profiling import swallowed
+from .caching import BIG_INT_MEMO, MEMO_MIN_BITS
+
+# Compiled regular expressions kept for StringComparison; 0 disables the cache
+REGEX_CACHE_SIZE = env_int("BASIC_MATH_REGEX_CACHE_SIZE", 512)
+
+# Largest result, in bits, IntMath computes for ** and <<; 0 removes the limit
+INT_MAX_BITS = env_int("BASIC_MATH_INT_MAX_BITS", 1 << 24)
+
+UINT64_MASK = 0xffffffffffffffff
+
+class Operation:
+    """
+    A named operation pre-bound to its implementation.
+
+    func is the raw callable. apply wraps it with the owning node's type-promotion and
+    error semantics, so callers get the node's exact result with a single lookup.
+    expression optionally spells func out inline (e.g. "a + b") so apply can skip the
+    extra call. preserves_int records whether integer operands may produce an integer result.
+    commutative records that swapping the two operands never changes the result, NaN included.
+    """
+    __slots__ = ("name", "func", "expression", "preserves_int", "commutative", "apply")
+
+    def __init__(self, name, func, expression=None, preserves_int=True, commutative=False):
+        self.name = name
+        self.func = func
+        self.expression = expression
+        self.preserves_int = preserves_int
+        self.commutative = commutative
+        self.apply = func
+
+    def __repr__(self):
+        return f"Operation({self.name!r})"
+
+class ApplyTemplate:
+    """Source for the apply function of every operation in a table."""
+    def __init__(self, arguments, source):
+        self.arguments = arguments
+        self.source = source
+
+def operation_table(template, *operations):
+    """
+    Compile each operation's apply from template and index the operations by name,
+    keeping UI order. Without a template, apply is the raw callable.
+    """
+    for op in operations:
+        if template is not None:
+            op.apply = compile_apply(template, op)
+    return {op.name: op for op in operations}
+
+def compile_apply(template, op):
+    arguments = ", ".join(template.arguments)
+    expression = op.expression or f"func({arguments})"
+    source = template.source.format(arguments=arguments, expression=expression, preserves_int=op.preserves_int)
+    namespace = {"func": op.func, "swallowed": swallowed}
+    exec(compile(source, f"<{op.name} apply>", "exec"), namespace)
+    return namespace["apply"]
+
+BASIC_MATH_TEMPLATE = ApplyTemplate(("a", "b"), """
+def apply({arguments}):
+    try:
+        result = {expression}
+        # Return as int if both inputs were int and operation preserves int type
+        if {preserves_int} and isinstance(result, int) and isinstance(a, int) and isinstance(b, int):
+            return int(result)
+        return float(result)
+    except:
+        swallowed()
+        return float('nan')
+""")
+
+INT_MATH_TEMPLATE = ApplyTemplate(("a", "b"), """
+def apply({arguments}):
+    try:
+        return {expression}
+    except:
+        swallowed()
+        return 0
+""")
+
+UNARY_MATH_TEMPLATE = ApplyTemplate(("value",), """
+def apply({arguments}):
+    try:
+        result = {expression}
+        if {preserves_int} and isinstance(value, int):
+            return int(result)
+        return float(result)
+    except:
+        swallowed()
+        return float('nan')
+""")
+
+def true_divide(a, b):
+    if b == 0:
+        return float('inf') if a > 0 else float('-inf')
+    return a / b
+
+def floor_divide(a, b):
+    if b == 0:
+        return float('inf') if a > 0 else float('-inf')
+    return a // b
+
+def modulo(a, b):
+    if b == 0:
+        return float('nan')
+    return a % b
+
+def int_floor_divide(a, b):
+    if b == 0:
+        return 0
+    return a // b
+
+def int_modulo(a, b):
+    if b == 0:
+        return 0
+    return a % b
+
+def estimated_bits(a, b, operation):
+    """Approximate size in bits of a ** b or a << b, without computing it; 0 for other operations."""
+    if operation == "**" and b > 0 and abs(a) > 1:
+        return b * math.log2(abs(a))
+    if operation == "<<" and b > 0 and a:
+        return a.bit_length() + b
+    return 0
+
+def within_int_limit(bits):
+    return INT_MAX_BITS <= 0 or bits <= INT_MAX_BITS
+
+def check_result_bits(bits):
+    if not within_int_limit(bits):
+        raise OverflowError(f"result would have about {bits:.0f} bits, more than BASIC_MATH_INT_MAX_BITS={INT_MAX_BITS}")
+
+def int_power(a, b):
+    if b > 0 and abs(a) > 1:
+        check_result_bits(estimated_bits(a, b, "**"))
+        # Results too large to recompute cheaply are memoized
+        if (abs(a).bit_length() - 1) * b > MEMO_MIN_BITS:
+            return BIG_INT_MEMO.get(("**", a, b), lambda: a ** b)
+    return a ** b
+
+def int_left_shift(a, b):
+    if b > 0 and a:
+        check_result_bits(estimated_bits(a, b, "<<"))
+        if b > MEMO_MIN_BITS:
+            return BIG_INT_MEMO.get(("<<", a, b), lambda: a << b)
+    return a << b
+
+def int_pow_mod(a, b, modulus):
+    # A zero modulus gives 0, like integer division by zero
+    if modulus == 0:
+        return 0
+    return pow(a, b, modulus)
+
+def int_math_wrapped(a, b, operation):
+    """
+    IntMath on unsigned 64-bit integers, wrapping like seed arithmetic. ** and << are reduced
+    as they go, so no intermediate is wider than 128 bits whatever the operands.
+    """
+    try:
+        if operation == "**" and b >= 0:
+            return pow(a, b, 1 << 64)
+        if operation == "<<" and b >= 0:
+            return (a << b) & UINT64_MASK if b < 64 else 0
+        return int(INT_MATH_OPS[operation].apply(a, b)) & UINT64_MASK
+    except:
+        swallowed()
+        return 0
+
+def minimum(a, b):
+    return min(a, b)
+
+def maximum(a, b):
+    return max(a, b)
+
+def log(value):
+    return math.log(abs(value)) if value != 0 else float('-inf')
+
+def log10(value):
+    return math.log10(abs(value)) if value != 0 else float('-inf')
+
+def clamp(value, min_value, max_value):
+    result = max(min_value, min(max_value, value))
+    # If all inputs are int, return int
+    if isinstance(value, int) and isinstance(min_value, int) and isinstance(max_value, int):
+        return int(result)
+    return float(result)
+
+def lerp(a, b, t):
+    result = a + t * (b - a)
+    # Lerp usually returns float due to multiplication
+    # Only return int if result is whole number and inputs were int
+    if isinstance(a, int) and isinstance(b, int) and isinstance(t, int) and result == int(result):
+        return int(result)
+    return float(result)
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_regex(pattern, case_sensitive=True):
+    """
+    The compiled pattern, or None if it is invalid. Compiled patterns stay in a bounded LRU;
+    compile_regex.cache_info() reports its hits and misses.
+    """
+    try:
+        return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+    except:
+        swallowed()
+        return None
+
+def regex_matcher(b, case_sensitive=True):
+    """regex_match with its pattern bound, for matching many strings against one pattern."""
+    try:
+        pattern = compile_regex(b, case_sensitive)
+    except:
+        swallowed()
+        pattern = None
+    if pattern is None:
+        return lambda a: False
+    def match(a):
+        try:
+            return pattern.match(a) is not None
+        except:
+            swallowed()
+            return False
+    return match
+
+def regex_match(a, b, case_sensitive=True):
+    try:
+        pattern = compile_regex(b, case_sensitive)
+        return pattern is not None and pattern.match(a) is not None
+    except:
+        swallowed()
+        return False
+
+BASIC_MATH_OPS = operation_table(
+    BASIC_MATH_TEMPLATE,
+    Operation("+", operator.add, "a + b", commutative=True),
+    Operation("-", operator.sub, "a - b"),
+    Operation("*", operator.mul, "a * b", commutative=True),
+    Operation("/", true_divide, preserves_int=False),
+    Operation("//", floor_divide),
+    Operation("%", modulo),
+    Operation("**", operator.pow, "a ** b"),
+    Operation("min", minimum, "b if b < a else a"),
+    Operation("max", maximum, "b if b > a else a"),
+)
+
+INT_MATH_OPS = operation_table(
+    INT_MATH_TEMPLATE,
+    Operation("+", operator.add, "a + b", commutative=True),
+    Operation("-", operator.sub, "a - b"),
+    Operation("*", operator.mul, "a * b", commutative=True),
+    Operation("//", int_floor_divide),
+    Operation("%", int_modulo),
+    Operation("**", int_power),
+    Operation("min", minimum, "b if b < a else a"),
+    Operation("max", maximum, "b if b > a else a"),
+    Operation("&", operator.and_, "a & b", commutative=True),
+    Operation("|", operator.or_, "a | b", commutative=True),
+    Operation("^", operator.xor, "a ^ b", commutative=True),
+    Operation("<<", int_left_shift),
+    Operation(">>", operator.rshift, "a >> b"),
+)
+
+# Takes the IntMath modulus input as well, so it is offered alongside INT_MATH_OPS rather than in it
+POW_MOD_OPERATION = "pow mod"
+
+UNARY_MATH_OPS = operation_table(
+    UNARY_MATH_TEMPLATE,
+    Operation("abs", abs),
+    Operation("neg", operator.neg, "-value"),
+    Operation("sqrt", lambda value: math.sqrt(abs(value)), preserves_int=False),
+    Operation("sin", math.sin, preserves_int=False),
+    Operation("cos", math.cos, preserves_int=False),
+    Operation("tan", math.tan, preserves_int=False),
+    Operation("log", log, preserves_int=False),
+    Operation("log10", log10, preserves_int=False),
+    Operation("exp", math.exp, preserves_int=False),
+    Operation("floor", math.floor),
+    Operation("ceil", math.ceil),
+    Operation("round", round),
+)
+
+COMPARISON_OPS = operation_table(
+    None,
+    Operation("==", operator.eq, commutative=True),
+    Operation("!=", operator.ne, commutative=True),
+    Operation("<", operator.lt),
+    Operation(">", operator.gt),
+    Operation("<=", operator.le),
+    Operation(">=", operator.ge),
+)
+
+# Matches case-insensitively with re.IGNORECASE rather than on lowercased strings
+REGEX_OPERATION = "a MATCH REGEX(b)"
+
+STRING_COMPARISON_OPS = operation_table(
+    None,
+    Operation("a == b", operator.eq, commutative=True),
+    Operation("a != b", operator.ne, commutative=True),
+    Operation("a IN b", lambda a, b: a in b),
+    Operation(REGEX_OPERATION, regex_match),
+    Operation("a BEGINSWITH b", str.startswith),
+    Operation("a ENDSWITH b", str.endswith),
+)
+
+BOOLEAN_LOGIC_OPS = operation_table(
+    None,
+    Operation("AND", lambda a, b: a and b, commutative=True),
+    Operation("OR", lambda a, b: a or b, commutative=True),
+    Operation("XOR", operator.xor, commutative=True),
+    Operation("NAND", lambda a, b: not (a and b), commutative=True),
+    Operation("NOR", lambda a, b: not (a or b), commutative=True),
+    Operation("XNOR", lambda a, b: not (a ^ b), commutative=True),
+)
+
+# The value of a that decides each operation's result without b
+SHORT_CIRCUIT_OPS = {"AND": False, "OR": True, "NAND": False, "NOR": True}
+
+def needs_b(a, operation):
+    """Whether a boolean logic result still depends on b once a is known."""
+    decisive = SHORT_CIRCUIT_OPS.get(operation)
+    return decisive is None or bool(a) != decisive
+
+# Over any number of inputs, in order; each stops at the first input that decides it
+VARIADIC_LOGIC_OPS = operation_table(
+    None,
+    Operation("AND", all),
+    Operation("OR", any),
+)
+
+BOOLEAN_UNARY_OPS = operation_table(
+    None,
+    Operation("NOT", operator.not_),
+    Operation("IDENTITY", lambda value: value),
+)
+
+def select_operations(table, subset):
+    """
+    Names of the operations in table listed in subset, a comma-separated string; every
+    operation when subset is blank.
+    """
+    names = {name.strip() for name in subset.split(",")} - {""}
+    if not names:
+        return set(table)
+    unknown = names.difference(table)
+    if unknown:
+        raise ValueError(f"Unknown operations {', '.join(sorted(unknown))}; choose from {', '.join(table)}")
+    return names
+
+def all_int(values):
+    return all(isinstance(x, int) for x in values)
+
+def first_nan(values):
+    """Index of the first nan in values, or -1."""
+    for i, x in enumerate(values):
+        if x != x:
+            return i
+    return -1
+
+def reduce_sum(values):
+    if all_int(values):
+        return sum(values)
+    try:
+        # Correctly rounded, unlike adding the values one at a time
+        return math.fsum(values)
+    except (OverflowError, ValueError):
+        # Intermediate overflow, or inf and -inf together; plain addition gives inf or nan
+        return float(sum(values))
+
+def reduce_mean(values):
+    if len(values) == 0:
+        return float('nan')
+    return reduce_sum(values) / len(values)
+
+def reduce_variance(values):
+    """Population variance, from the fsum of squared deviations from the mean."""
+    mean = reduce_mean(values)
+    if not math.isfinite(mean):
+        return float('nan')
+    try:
+        return math.fsum((x - mean) ** 2 for x in values) / len(values)
+    except (OverflowError, ValueError):
+        return float('nan')
+
+def reduce_stdev(values):
+    return math.sqrt(reduce_variance(values))
+
+def reduce_product(values):
+    result = math.prod(values)
+    return result if all_int(values) else float(result)
+
+def reduce_extreme(values, pick):
+    if len(values) == 0 or first_nan(values) >= 0:
+        return float('nan')
+    result = pick(values)
+    return result if all_int(values) else float(result)
+
+def reduce_arg_extreme(values, pick):
+    """Index of the first extreme value, or of the first nan if there is one; -1 when empty."""
+    if len(values) == 0:
+        return -1
+    nan = first_nan(values)
+    if nan >= 0:
+        return nan
+    return pick(range(len(values)), key=values.__getitem__)
+
+def percentile(values, q=50.0):
+    """q-th percentile with linear interpolation between the closest ranks."""
+    if len(values) == 0 or first_nan(values) >= 0:
+        return float('nan')
+    ordered = sorted(values)
+    rank = min(max(q, 0.0), 100.0) / 100 * (len(ordered) - 1)
+    low = math.floor(rank)
+    fraction = rank - low
+    if fraction == 0:
+        return ordered[low] if all_int(ordered) else float(ordered[low])
+    a, b = ordered[low], ordered[low + 1]
+    return float(a + (b - a) * fraction)
+
+# Reductions of a list of numbers to one number. Sums use math.fsum; results are ints only
+# when every value is an int and the reduction can't produce a fraction.
+REDUCE_OPS = operation_table(
+    None,
+    Operation("sum", reduce_sum),
+    Operation("mean", reduce_mean, preserves_int=False),
+    Operation("min", lambda values: reduce_extreme(values, min)),
+    Operation("max", lambda values: reduce_extreme(values, max)),
+    Operation("product", reduce_product),
+    Operation("argmin", lambda values: reduce_arg_extreme(values, min)),
+    Operation("argmax", lambda values: reduce_arg_extreme(values, max)),
+    Operation("variance", reduce_variance, preserves_int=False),
+    Operation("stdev", reduce_stdev, preserves_int=False),
+    Operation("percentile", percentile),
+)
+
+# Curves mapping t in [0, 1] onto [0, 1]
+EASING_OPS = operation_table(
+    None,
+    Operation("linear", lambda t: t),
+    Operation("ease_in_quad", lambda t: t * t),
+    Operation("ease_out_quad", lambda t: t * (2 - t)),
+    Operation("ease_in_out_quad", lambda t: 2 * t * t if t < 0.5 else 1 - (2 - 2 * t) ** 2 / 2),
+    Operation("ease_in_cubic", lambda t: t ** 3),
+    Operation("ease_out_cubic", lambda t: 1 - (1 - t) ** 3),
+    Operation("ease_in_out_cubic", lambda t: 4 * t ** 3 if t < 0.5 else 1 - (2 - 2 * t) ** 3 / 2),
+    Operation("ease_in_sine", lambda t: 1 - math.cos(t * math.pi / 2)),
+    Operation("ease_out_sine", lambda t: math.sin(t * math.pi / 2)),
+    Operation("ease_in_out_sine", lambda t: (1 - math.cos(math.pi * t)) / 2),
+)
+
+ROUND_METHODS = {
+    "round": round,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "trunc": math.trunc,
+}
+
+MATH_CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+    "inf": float('inf'),
+    "nan": float('nan'),
+}
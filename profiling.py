@@ -0,0 +1,145 @@
+"""
+Opt-in per-node profiling. With BASIC_MATH_PROFILE=1, VariantSupport wraps every node's
+FUNCTION to count calls, time them and count the exceptions they raise. Exceptions a node
+catches and turns into a fallback value (nan, 0, False...) are reported through swallowed().
+
+snapshot() returns the aggregated stats. With BASIC_MATH_PROFILE_DUMP set to a file path, a
+background thread also writes the snapshot there as JSON every BASIC_MATH_PROFILE_INTERVAL
+seconds (default 60) and once more at exit.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+PROFILE_ENV = "BASIC_MATH_PROFILE"
+PROFILE_DUMP_ENV = "BASIC_MATH_PROFILE_DUMP"
+PROFILE_INTERVAL_ENV = "BASIC_MATH_PROFILE_INTERVAL"
+
+PROFILING_ENABLED = os.environ.get(PROFILE_ENV, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+# Latencies kept per node for percentiles; older calls still count in the totals
+LATENCY_SAMPLES = 1024
+
+_lock = threading.Lock()
+_stats = {}
+# Stats of the node running on this thread, so swallowed() knows whom to charge
+_local = threading.local()
+
+
+class NodeStats:
+    __slots__ = ("calls", "total_ns", "max_ns", "latencies", "errors", "swallowed")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.errors = {}
+        self.swallowed = {}
+
+    def snapshot(self):
+        ordered = sorted(self.latencies)
+        def percentile(q):
+            if not ordered:
+                return None
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1000
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.calls / 1000 if self.calls else None,
+            "p50_us": percentile(0.50),
+            "p90_us": percentile(0.90),
+            "p99_us": percentile(0.99),
+            "max_us": self.max_ns / 1000,
+            "errors": dict(self.errors),
+            "swallowed": dict(self.swallowed),
+        }
+
+def node_stats(name):
+    with _lock:
+        return _stats.setdefault(name, NodeStats())
+
+def count(counts, exception):
+    kind = type(exception)
+    name = kind.__qualname__ if kind.__module__ == "builtins" else f"{kind.__module__}.{kind.__qualname__}"
+    counts[name] = counts.get(name, 0) + 1
+
+def instrument(name, func):
+    """Wrap a node's FUNCTION so its calls are recorded under name."""
+    stats = node_stats(name)
+    @functools.wraps(func)
+    def profiled(*args, **kwargs):
+        outer = getattr(_local, "stats", None)
+        _local.stats = stats
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            with _lock:
+                count(stats.errors, e)
+            raise
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            _local.stats = outer
+            with _lock:
+                stats.calls += 1
+                stats.total_ns += elapsed
+                stats.latencies.append(elapsed)
+                if elapsed > stats.max_ns:
+                    stats.max_ns = elapsed
+    return profiled
+
+def swallowed():
+    """
+    Call from an except block that replaces an exception with a fallback value. Charged to
+    the node currently running; does nothing when profiling is off.
+    """
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        with _lock:
+            count(stats.swallowed, sys.exc_info()[1])
+
+def snapshot():
+    """Node name -> call count, latency summary and exception counts."""
+    with _lock:
+        return {name: stats.snapshot() for name, stats in _stats.items() if stats.calls}
+
+def reset():
+    with _lock:
+        for stats in _stats.values():
+            # Instrumented functions hold on to their stats, so clear them in place
+            stats.__init__()
+
+def dump(path):
+    """Write the current snapshot to path as JSON, replacing the file atomically."""
+    import json
+    report = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "pid": os.getpid(), "nodes": snapshot()}
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(report, f, indent=1)
+    os.replace(temporary, path)
+
+def start_periodic_dump():
+    """Start the dump thread if profiling is on and BASIC_MATH_PROFILE_DUMP names a file."""
+    path = os.environ.get(PROFILE_DUMP_ENV)
+    if not PROFILING_ENABLED or not path:
+        return False
+    import atexit
+    import logging
+    try:
+        interval = float(os.environ.get(PROFILE_INTERVAL_ENV, 60))
+    except ValueError:
+        interval = 60.0
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                dump(path)
+            except OSError as e:
+                logging.warning(f"Basic Math: could not write profile to {path}: {e}")
+    threading.Thread(target=run, name="basic-math-profile-dump", daemon=True).start()
+    atexit.register(dump, path)
+    return True
@@ -0,0 +1,137 @@
+"""
+Node registry. The manifest lists every node with its display name by defining module, so
+ComfyUI can be handed NODE_CLASS_MAPPINGS without importing the node modules: each entry is
+a proxy class that imports its module on first real use.
+"""
+import importlib
+import os
+
+from .base_node import NODE_POSTFIX
+
+# Set to 1 to import every node module at startup and register the real classes
+EAGER_NODES_ENV = "BASIC_MATH_EAGER_NODES"
+
+# module -> {node name: display name without the postfix}, in menu order
+NODE_MANIFEST = {
+    "math_nodes": {
+        "IntegerInput": "Integer",
+        "FloatInput": "Float",
+        "PreciseFloatInput": "Precise Float",
+        "BooleanInput": "Boolean",
+        "StringInput": "String",
+        "ToInt": "To Int",
+        "ToFloat": "To Float",
+        "ToString": "To String",
+        "ToBool": "To Bool",
+        "BasicMath": "Basic Math",
+        "IntMath": "Int Math",
+        "UnaryMath": "Unary Math",
+        "BasicMathAll": "Basic Math (All Operations)",
+        "IntMathAll": "Int Math (All Operations)",
+        "UnaryMathAll": "Unary Math (All Operations)",
+        "MathExpression": "Math Expression",
+        "MathConstants": "Math Constants",
+        "NumberRound": "Number Round",
+        "NumberClamp": "Number Clamp",
+        "NumberLerp": "Number Lerp",
+        "BasicMathTensor": "Basic Math (Tensor)",
+        "UnaryMathTensor": "Unary Math (Tensor)",
+        "NumberClampTensor": "Number Clamp (Tensor)",
+        "NumberLerpTensor": "Number Lerp (Tensor)",
+        "FusedMath": "Fused Math",
+        "NumberInRange": "Number In Range",
+        "NumberComparison": "Number Comparison",
+        "NumberComparisonAll": "Number Comparison (All Operations)",
+        "IntegerComparison": "Integer Comparison",
+        "FloatComparison": "Float Comparison",
+        "StringComparison": "String Comparison",
+        "BooleanLogic": "Boolean Logic",
+        "BooleanLogicMulti": "Boolean Logic (Multiple Inputs)",
+        "BooleanUnary": "Boolean Unary",
+        "IfElse": "If Else",
+        "SelectByIndex": "Select By Index",
+    },
+    "list_nodes": {
+        "BasicMathList": "Basic Math (List)",
+        "IntMathList": "Int Math (List)",
+        "UnaryMathList": "Unary Math (List)",
+        "StringComparisonList": "String Comparison (List)",
+        "NumberComparisonList": "Number Comparison (List)",
+        "NumberInRangeList": "Number In Range (List)",
+        "BooleanLogicList": "Boolean Logic (List)",
+        "FilterByMask": "Filter By Mask",
+        "ToIntList": "To Int (List)",
+        "ToFloatList": "To Float (List)",
+        "ToBoolList": "To Bool (List)",
+        "NumberReduce": "Number Reduce",
+        "ScheduleValueList": "Schedule Value (List)",
+        "ListToArray": "List To Array",
+        "ArrayToList": "Array To List",
+    },
+    "sequence_nodes": {
+        "LinspaceSequence": "Linspace Sequence",
+        "ArangeSequence": "Arange Sequence",
+        "GeometricSequence": "Geometric Sequence",
+        "EasingSequence": "Easing Sequence",
+        "SequenceToList": "Sequence To List",
+        "ScheduleValue": "Schedule Value",
+        "ScheduleSequence": "Schedule Sequence",
+    },
+}
+
+def display_names(module_name):
+    return {name: f"{title} {NODE_POSTFIX}" for name, title in NODE_MANIFEST[module_name].items()}
+
+def eager_nodes():
+    return os.environ.get(EAGER_NODES_ENV, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+def load_module(module_name):
+    return importlib.import_module(f".{module_name}", __package__)
+
+class LazyNode(type):
+    """
+    Metaclass of node proxies. Reading an attribute the proxy doesn't have, or calling it,
+    imports the node's module and forwards to the real class. Attributes ComfyUI sets on
+    the proxy before that are copied over when the real class is loaded.
+    """
+    def load(cls):
+        node_class = type.__getattribute__(cls, "_node_class")
+        if node_class is None:
+            node_class = load_module(cls._module_name).__dict__[cls.__name__]
+            for name, value in cls._assigned.items():
+                setattr(node_class, name, value)
+            type.__setattr__(cls, "_node_class", node_class)
+        return node_class
+
+    def __getattr__(cls, name):
+        return getattr(cls.load(), name)
+
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        if cls._node_class is None:
+            cls._assigned[name] = value
+        else:
+            setattr(cls._node_class, name, value)
+
+    def __call__(cls, *args, **kwargs):
+        return cls.load()(*args, **kwargs)
+
+def lazy_node(module_name, name):
+    return LazyNode(name, (), {"_module_name": module_name, "_node_class": None, "_assigned": {}, "__module__": f"{__package__}.{module_name}"})
+
+def node_class_mappings():
+    """NODE_CLASS_MAPPINGS for ComfyUI: proxies, or the real classes in eager mode."""
+    mappings = {}
+    for module_name, nodes in NODE_MANIFEST.items():
+        if eager_nodes():
+            module = load_module(module_name)
+            mappings.update((name, getattr(module, name)) for name in nodes)
+        else:
+            mappings.update((name, lazy_node(module_name, name)) for name in nodes)
+    return mappings
+
+def display_name_mappings():
+    mappings = {}
+    for module_name in NODE_MANIFEST:
+        mappings.update(display_names(module_name))
+    return mappings
@@ -0,0 +1,96 @@
+"""
+Keyframe schedules such as "0:(1.0), 24:(2.5), 96:(0.3)". A schedule is parsed once per
+distinct text into sorted keyframes; a frame is looked up by binary search and interpolated
+between its two surrounding keyframes with NumberLerp's math. Frames before the first or
+after the last keyframe hold its value.
+"""
+from bisect import bisect_right
+from functools import lru_cache
+
+from .operators import EASING_OPS, lerp
+from .sequences import NumberSequence
+
+# Holds each segment's start value instead of interpolating; the other methods are EASING_OPS
+STEP = "step"
+INTERPOLATIONS = [STEP] + list(EASING_OPS)
+
+# Distinct schedule texts kept parsed
+SCHEDULE_CACHE_SIZE = 256
+
+
+class Schedule:
+    """Keyframes sorted by frame, with float values."""
+    __slots__ = ("frames", "values")
+
+    def __init__(self, keyframes):
+        self.frames = tuple(sorted(keyframes))
+        self.values = tuple(keyframes[frame] for frame in self.frames)
+
+    def value_at(self, frame, interpolation="linear"):
+        i = bisect_right(self.frames, frame) - 1
+        if i < 0:
+            return self.values[0]
+        if i == len(self.frames) - 1 or interpolation == STEP:
+            return self.values[i]
+        start, end = self.frames[i], self.frames[i + 1]
+        t = EASING_OPS[interpolation].func((frame - start) / (end - start))
+        return float(lerp(self.values[i], self.values[i + 1], t))
+
+    def values_at(self, frames, interpolation="linear", np=None):
+        """
+        value_at for every frame. With NumPy, step and linear schedules are looked up as one
+        batch and returned as an array; easing curves stay in Python to match value_at exactly.
+        """
+        if np is None or interpolation not in (STEP, "linear"):
+            return [self.value_at(frame, interpolation) for frame in frames]
+        x = frames.to_array(np) if isinstance(frames, NumberSequence) else np.asarray(frames, dtype=np.float64)
+        keys = np.asarray(self.frames, dtype=np.float64)
+        values = np.asarray(self.values, dtype=np.float64)
+        last = len(keys) - 1
+        i = np.searchsorted(keys, x, side="right") - 1
+        low = np.clip(i, 0, last)
+        if interpolation == STEP:
+            return values[low]
+        high = np.minimum(low + 1, last)
+        with np.errstate(all="ignore"):
+            t = (x - keys[low]) / (keys[high] - keys[low])
+            # Same operations, in the same order, as operators.lerp
+            result = values[low] + t * (values[high] - values[low])
+        return np.where((i < 0) | (i >= last), values[low], result)
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def parse_schedule(text):
+    """Parse comma-separated frame:(value) keyframes. A repeated frame keeps its last value."""
+    keyframes = {}
+    for entry in text.split(","):
+        if not entry.strip():
+            continue
+        frame, separator, value = entry.partition(":")
+        value = value.strip()
+        if value.startswith("(") and value.endswith(")"):
+            value = value[1:-1]
+        try:
+            if not separator:
+                raise ValueError
+            keyframes[int(frame)] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid keyframe {entry.strip()!r}, expected frame:(value)") from None
+    if not keyframes:
+        raise ValueError("Schedule has no keyframes")
+    return Schedule(keyframes)
+
+class Scheduled(NumberSequence):
+    """A schedule's values for count consecutive frames from start_frame."""
+    def __init__(self, schedule, start_frame, count, interpolation):
+        super().__init__(max(0, count))
+        self.schedule = schedule
+        self.start_frame = start_frame
+        self.interpolation = interpolation
+
+    def value(self, i):
+        return self.schedule.value_at(self.start_frame + i, self.interpolation)
+
+    def to_array(self, np):
+        frames = np.arange(self.start_frame, self.start_frame + self.length)
+        result = self.schedule.values_at(frames, self.interpolation, np)
+        return np.asarray(result, dtype=np.float64)
@@ -0,0 +1,202 @@
+from .tools import VariantSupport
+from .base_node import SequenceNode
+from .math_nodes import NUMBER
+from .registry import display_names
+from .operators import EASING_OPS
+from .sequences import Linspace, Arange, Geometric, Eased
+from .schedules import INTERPOLATIONS, Scheduled, parse_schedule
+
+# A lazy NumberSequence; list nodes take it directly, Sequence To List expands it
+NUMBER_SEQUENCE = "NUMBER_SEQUENCE"
+
+COUNT_INPUT = ("INT", {"default": 10, "min": 0, "max": 0xffffffff, "step": 1})
+FRAME_INPUT = ("INT", {"default": 0, "min": -0xffffffff, "max": 0xffffffff, "step": 1})
+SCHEDULE_INPUT = ("STRING", {"default": "0:(0.0), 24:(1.0)", "multiline": True})
+
+@VariantSupport()
+class LinspaceSequence(SequenceNode):
+    """
+    Evenly spaced numbers from start to stop, both included.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "start": (NUMBER, {"default": 0.0}),
+                "stop": (NUMBER, {"default": 1.0}),
+                "count": COUNT_INPUT,
+            },
+        }
+
+    RETURN_TYPES = (NUMBER_SEQUENCE,)
+    RETURN_NAMES = ("SEQUENCE",)
+    FUNCTION = "generate"
+
+    def generate(self, start, stop, count):
+        return (Linspace(start, stop, count),)
+
+@VariantSupport()
+class ArangeSequence(SequenceNode):
+    """
+    Numbers from start up to but excluding stop, step apart. Integer inputs give integers.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "start": (NUMBER, {"default": 0}),
+                "stop": (NUMBER, {"default": 10}),
+                "step": (NUMBER, {"default": 1}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER_SEQUENCE,)
+    RETURN_NAMES = ("SEQUENCE",)
+    FUNCTION = "generate"
+
+    def generate(self, start, stop, step):
+        return (Arange(start, stop, step),)
+
+@VariantSupport()
+class GeometricSequence(SequenceNode):
+    """
+    count numbers starting at start, each ratio times the previous one.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "start": (NUMBER, {"default": 1.0}),
+                "ratio": (NUMBER, {"default": 2.0}),
+                "count": COUNT_INPUT,
+            },
+        }
+
+    RETURN_TYPES = (NUMBER_SEQUENCE,)
+    RETURN_NAMES = ("SEQUENCE",)
+    FUNCTION = "generate"
+
+    def generate(self, start, ratio, count):
+        return (Geometric(start, ratio, count),)
+
+@VariantSupport()
+class EasingSequence(SequenceNode):
+    """
+    count numbers from start to stop, both included, spaced along an easing curve.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "start": (NUMBER, {"default": 0.0}),
+                "stop": (NUMBER, {"default": 1.0}),
+                "count": COUNT_INPUT,
+                "easing": (list(EASING_OPS),),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER_SEQUENCE,)
+    RETURN_NAMES = ("SEQUENCE",)
+    FUNCTION = "generate"
+
+    def generate(self, start, stop, count, easing):
+        return (Eased(start, stop, count, easing),)
+
+@VariantSupport()
+class SequenceToList(SequenceNode):
+    """
+    Expand a sequence into a list, so nodes such as Basic Math run once per value.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "sequence": (NUMBER_SEQUENCE,),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER,)
+    RETURN_NAMES = ("NUMBER",)
+    FUNCTION = "expand"
+    OUTPUT_IS_LIST = (True,)
+
+    def expand(self, sequence):
+        return (list(sequence),)
+
+@VariantSupport()
+class ScheduleValue(SequenceNode):
+    """
+    The value of a keyframe schedule such as "0:(1.0), 24:(2.5)" at one frame.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "schedule": SCHEDULE_INPUT,
+                "frame": FRAME_INPUT,
+                "interpolation": (INTERPOLATIONS, {"default": "linear"}),
+            },
+        }
+
+    RETURN_TYPES = ("FLOAT",)
+    RETURN_NAMES = ("FLOAT",)
+    FUNCTION = "evaluate"
+
+    def evaluate(self, schedule, frame, interpolation):
+        return (parse_schedule(schedule).value_at(frame, interpolation),)
+
+@VariantSupport()
+class ScheduleSequence(SequenceNode):
+    """
+    A keyframe schedule's values for count frames from start_frame.
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "schedule": SCHEDULE_INPUT,
+                "start_frame": FRAME_INPUT,
+                "count": COUNT_INPUT,
+                "interpolation": (INTERPOLATIONS, {"default": "linear"}),
+            },
+        }
+
+    RETURN_TYPES = (NUMBER_SEQUENCE,)
+    RETURN_NAMES = ("SEQUENCE",)
+    FUNCTION = "generate"
+
+    def generate(self, schedule, start_frame, count, interpolation):
+        return (Scheduled(parse_schedule(schedule), start_frame, count, interpolation),)
+
+SEQUENCE_NODE_CLASS_MAPPINGS = {
+    "LinspaceSequence": LinspaceSequence,
+    "ArangeSequence": ArangeSequence,
+    "GeometricSequence": GeometricSequence,
+    "EasingSequence": EasingSequence,
+    "SequenceToList": SequenceToList,
+    "ScheduleValue": ScheduleValue,
+    "ScheduleSequence": ScheduleSequence,
+}
+
+SEQUENCE_NODE_DISPLAY_NAME_MAPPINGS = display_names("sequence_nodes")
@@ -0,0 +1,205 @@
+"""
+Lazy number sequences. A sequence stores its descriptor (start, stop, step or count...) and
+computes an element only when it is indexed or iterated, so a million-step sequence costs
+the same to create and pass around as a ten-step one.
+"""
+import math
+from array import array
+from collections.abc import Sequence
+
+from .operators import EASING_OPS, lerp
+
+
+class NumberSequence(Sequence):
+    """
+    Base class: subclasses set the length and implement value(i) for 0 <= i < length.
+    is_float tells consumers every element is a float without computing any of them.
+    """
+    is_float = True
+
+    def __init__(self, length):
+        self.length = length
+
+    def value(self, i):
+        raise NotImplementedError
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.value(i) for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("sequence index out of range")
+        return self.value(index)
+
+    def __iter__(self):
+        return map(self.value, range(self.length))
+
+    def to_array(self, np):
+        """The elements as a float64 NumPy array, bit-identical to value()."""
+        return np.fromiter(self, dtype=np.float64, count=self.length)
+
+    def to_int_array(self, np):
+        """The elements of an integer sequence as an int64 NumPy array."""
+        return np.fromiter(self, dtype=np.int64, count=self.length)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(length={self.length})"
+
+class Linspace(NumberSequence):
+    """count evenly spaced floats from start to stop inclusive, like numpy.linspace."""
+    def __init__(self, start, stop, count):
+        super().__init__(max(0, count))
+        self.start = start
+        self.stop = stop
+        self.step = (stop - start) / (count - 1) if count > 1 else 0.0
+
+    def value(self, i):
+        if i == self.length - 1 and i > 0:
+            return float(self.stop)
+        return float(self.start + i * self.step)
+
+    def to_array(self, np):
+        array = np.arange(self.length, dtype=np.float64) * self.step + self.start
+        if self.length > 1:
+            array[-1] = self.stop
+        return array
+
+class Arange(NumberSequence):
+    """start, start + step, ... up to but excluding stop. All-int arguments give ints, like range."""
+    def __init__(self, start, stop, step):
+        if step == 0:
+            raise ValueError("Sequence step must not be zero")
+        self.is_float = not (isinstance(start, int) and isinstance(stop, int) and isinstance(step, int))
+        if self.is_float:
+            length = max(0, math.ceil((stop - start) / step))
+        else:
+            self.range = range(start, stop, step)
+            length = len(self.range)
+        super().__init__(length)
+        self.start = start
+        self.step = step
+
+    def value(self, i):
+        if self.is_float:
+            return float(self.start + i * self.step)
+        return self.range[i]
+
+    def __iter__(self):
+        if self.is_float:
+            return super().__iter__()
+        return iter(self.range)
+
+    def to_array(self, np):
+        if not self.is_float:
+            return super().to_array(np)
+        return np.arange(self.length, dtype=np.float64) * self.step + self.start
+
+class Geometric(NumberSequence):
+    """start, start * ratio, start * ratio ** 2, ... for count elements."""
+    def __init__(self, start, ratio, count):
+        super().__init__(max(0, count))
+        self.is_float = not (isinstance(start, int) and isinstance(ratio, int))
+        self.start = start
+        self.ratio = ratio
+
+    def value(self, i):
+        try:
+            result = self.start * self.ratio ** i
+        except OverflowError:
+            # A float ratio ** i past the float range saturates, as float multiplication does
+            if not self.start:
+                return 0.0
+            negative = (self.start < 0) != (self.ratio < 0 and i % 2 == 1)
+            return -math.inf if negative else math.inf
+        return float(result) if self.is_float else result
+
+class Eased(NumberSequence):
+    """count floats from start to stop inclusive, spaced by an easing curve."""
+    def __init__(self, start, stop, count, easing):
+        super().__init__(max(0, count))
+        self.start = start
+        self.stop = stop
+        # The name rather than the function, so the sequence pickles for offloaded calls
+        self.easing = EASING_OPS[easing].name
+
+    def value(self, i):
+        t = i / (self.length - 1) if self.length > 1 else 0.0
+        return float(lerp(self.start, self.stop, EASING_OPS[self.easing].func(t)))
+
+class NumberArray(NumberSequence):
+    """
+    Numbers packed in one buffer, float64 ("d") or int64 ("q"), read through a memoryview.
+    The buffer is an array.array or a NumPy array and is read-only once wrapped, so nodes
+    pass the same NumberArray along and NumPy reads it in place instead of copying.
+    """
+    def __init__(self, buffer, typecode):
+        self.view = memoryview(buffer).toreadonly().cast("B").cast(typecode)
+        super().__init__(len(self.view))
+        self.typecode = typecode
+        self.is_float = typecode == "d"
+
+    def value(self, i):
+        return self.view[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view[index].tolist()
+        return self.view[index]
+
+    def __iter__(self):
+        return iter(self.view)
+
+    def tolist(self):
+        return self.view.tolist()
+
+    def to_array(self, np):
+        if self.is_float:
+            return np.frombuffer(self.view, dtype=np.float64)
+        return np.frombuffer(self.view, dtype=np.int64).astype(np.float64)
+
+    def to_int_array(self, np):
+        return np.frombuffer(self.view, dtype=np.int64)
+
+    def __reduce__(self):
+        # memoryviews can't be pickled; the bytes rebuild an equal array
+        return (NumberArray, (array(self.typecode, self.view.tobytes()), self.typecode))
+
+def as_double(x):
+    """x as a float, with ints too large for one saturating to an infinity of their sign."""
+    try:
+        return float(x)
+    except OverflowError:
+        return math.inf if x > 0 else -math.inf
+
+def pack(values):
+    """
+    values as a NumberArray. A NumPy result becomes the buffer itself; a list is packed as
+    int64 if every value is an int that fits, otherwise as float64, like a mixed result.
+    """
+    if isinstance(values, NumberArray):
+        return values
+    if hasattr(values, "dtype"):
+        # Already imported, or there would be no NumPy array
+        import numpy as np
+        if values.dtype.kind == "f":
+            return NumberArray(np.ascontiguousarray(values, dtype=np.float64), "d")
+        return NumberArray(np.ascontiguousarray(values, dtype=np.int64), "q")
+    if set(map(type, values)) <= {int}:
+        try:
+            return NumberArray(array("q", values), "q")
+        except OverflowError:
+            pass
+    try:
+        return NumberArray(array("d", values), "d")
+    except OverflowError:
+        return NumberArray(array("d", map(as_double, values)), "d")
+
+def expand_sequence(values):
+    """A list input holding one NumberSequence stands for all of its values."""
+    if len(values) == 1 and isinstance(values[0], NumberSequence):
+        return values[0]
+    return values
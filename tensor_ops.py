@@ -0,0 +1,228 @@
+"""
+Torch tensor versions of the arithmetic kernels, for IMAGE, MASK and LATENT inputs.
+
+torch is never imported here: a tensor can only exist once something else has imported it,
+so the checks below cost nothing when it isn't loaded. Inputs are never modified, because
+ComfyUI caches node outputs and shares them between consumers. In-place ops are only
+applied to intermediate results these kernels allocated themselves.
+"""
+import math
+import operator
+import sys
+
+from .sequences import NumberArray
+
+# Types that are never tensors, checked first to keep the scalar path cheap
+SCALAR_TYPES = frozenset((int, float, bool, str))
+
+OUT_OF_PLACE = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+}
+
+def is_tensor(x):
+    torch = sys.modules.get("torch")
+    return torch is not None and isinstance(x, torch.Tensor)
+
+def is_latent(x):
+    return isinstance(x, dict) and is_tensor(x.get("samples"))
+
+def has_tensor(*values):
+    for x in values:
+        if type(x) not in SCALAR_TYPES and (is_tensor(x) or is_latent(x)):
+            return True
+    return False
+
+def array_tensor(x):
+    """A NUMBER_ARRAY as a 1-D tensor of its own dtype, copied so the tensor is writable."""
+    torch = sys.modules["torch"]
+    dtype = torch.float64 if x.is_float else torch.int64
+    if not len(x):
+        # frombuffer rejects empty buffers
+        return torch.empty(0, dtype=dtype)
+    return torch.frombuffer(bytearray(x.view), dtype=dtype)
+
+def unwrap(values):
+    """
+    Replace LATENT dicts by their samples and NUMBER_ARRAYs by tensors.
+    Returns (values, first latent dict or None).
+    """
+    latent = None
+    unwrapped = []
+    for x in values:
+        if is_latent(x):
+            latent = latent or x
+            x = x["samples"]
+        elif type(x) is NumberArray:
+            x = array_tensor(x)
+        unwrapped.append(x)
+    return unwrapped, latent
+
+def wrap(result, latent):
+    if latent is None:
+        return result
+    return dict(latent, samples=result)
+
+def latent_aware(kernel):
+    """Let a tensor kernel accept LATENT dicts, returning a LATENT with the new samples."""
+    def apply(*args):
+        args, latent = unwrap(args)
+        return wrap(kernel(*args), latent)
+    return apply
+
+def fits_in_place(result, other):
+    """Whether result (a tensor we allocated) can hold result <op> other without reallocating."""
+    torch = sys.modules["torch"]
+    if not is_tensor(result):
+        return False
+    other_shape = other.shape if is_tensor(other) else ()
+    return torch.result_type(result, other) == result.dtype and torch.broadcast_shapes(result.shape, other_shape) == result.shape
+
+def apply_owned(result, name, other):
+    """result <name> other, reusing result's buffer when it fits. result must be ours to overwrite."""
+    if fits_in_place(result, other):
+        return getattr(result, name + "_")(other)
+    return OUT_OF_PLACE[name](result, other)
+
+def fill_zero_divisors(result, a, b, zero_value):
+    """Overwrite result where b == 0 the way BasicMath does: +/-inf by the sign of a, or zero_value."""
+    torch = sys.modules["torch"]
+    zero = b == 0
+    if not is_tensor(zero):
+        if not zero:
+            return result
+        zero = torch.ones((), dtype=torch.bool, device=result.device)
+    if zero_value is None:
+        positive = torch.as_tensor(a > 0, device=result.device)
+        result.masked_fill_(zero & positive, float('inf'))
+        result.masked_fill_(zero & ~positive, float('-inf'))
+    else:
+        result.masked_fill_(zero, zero_value)
+    return result
+
+def to_floating(x):
+    if is_tensor(x) and not x.is_floating_point():
+        return x.to(sys.modules["torch"].get_default_dtype())
+    return x
+
+def is_finite(x):
+    # torch.as_tensor would round a scalar to float32, turning large finite values into inf
+    return sys.modules["torch"].isfinite(x) if is_tensor(x) else math.isfinite(x)
+
+def as_tensor_like(a, b):
+    """A scalar a as a 0-d tensor of the type a <op> b has, for ops torch rewrites for scalars."""
+    if is_tensor(a):
+        return a
+    return sys.modules["torch"].as_tensor(a, dtype=sys.modules["torch"].result_type(a, b), device=b.device)
+
+def python_remainder(a, b):
+    """Floating a % b as Python computes it: fmod, moved to the sign of b, zeros included."""
+    torch = sys.modules["torch"]
+    a = as_tensor_like(a, b)
+    result = torch.fmod(a, b)
+    divisor = torch.as_tensor(b, dtype=result.dtype, device=result.device)
+    # torch's vectorized fmod gives nan when a / b is past the float range; redo those exactly
+    lost = torch.isnan(result) & torch.isfinite(a) & ~torch.isnan(divisor) & (divisor != 0)
+    if any_true(lost):
+        index = lost.nonzero(as_tuple=True)
+        pairs = zip(torch.broadcast_to(a, result.shape)[index].tolist(), torch.broadcast_to(divisor, result.shape)[index].tolist())
+        result[index] = torch.tensor([math.fmod(x, y) for x, y in pairs], dtype=result.dtype, device=result.device)
+    result = torch.where((result != 0) & ((divisor < 0) != (result < 0)), result + divisor, result)
+    return torch.where(result == 0, torch.copysign(torch.zeros_like(result), divisor), result)
+
+def any_true(condition):
+    return bool(condition.any()) if is_tensor(condition) else bool(condition)
+
+@latent_aware
+def basic_math(a, b, operation):
+    torch = sys.modules["torch"]
+    integral = not torch.result_type(a, b).is_floating_point
+    if operation == "+":
+        return a + b
+    elif operation == "-":
+        return a - b
+    elif operation == "*":
+        return a * b
+    elif operation == "/":
+        # scalar / tensor would be computed as a * (1 / b), which rounds twice
+        return fill_zero_divisors(to_floating(as_tensor_like(a, b)) / to_floating(b), a, b, None)
+    elif operation in ("//", "%"):
+        zero_divisor = any_true(b == 0)
+        if integral and not zero_divisor:
+            return a // b if operation == "//" else a % b
+        # Division by zero gives a float inf or nan, as it does for scalars
+        if integral:
+            a, b = to_floating(a), to_floating(b)
+        result = a // b if operation == "//" else python_remainder(a, b)
+        if not zero_divisor:
+            return result
+        return fill_zero_divisors(result, a, b, None if operation == "//" else float('nan'))
+    elif operation == "**":
+        negative = b < 0
+        # Negative powers are fractional, which BasicMath returns as floats
+        result = to_floating(a) ** to_floating(b) if integral and any_true(negative) else a ** b
+        if not result.is_floating_point():
+            return result
+        # Python raises where a finite power overflows or 0 meets a finite negative power
+        # (0 ** -inf is inf), which BasicMath reports as nan
+        finite = is_finite(a) & is_finite(b)
+        error = finite & (torch.isinf(result) | torch.as_tensor((a == 0) & negative, device=result.device))
+        return result.masked_fill_(error, float('nan'))
+    elif operation == "min":
+        return torch.where(torch.as_tensor(b < a), b, a)
+    elif operation == "max":
+        return torch.where(torch.as_tensor(b > a), b, a)
+    raise KeyError(operation)
+
+@latent_aware
+def unary_math(value, operation):
+    torch = sys.modules["torch"]
+    if operation == "abs":
+        return torch.abs(value)
+    elif operation == "neg":
+        return torch.neg(value)
+    elif operation in ("sqrt", "log", "log10"):
+        # abs allocates a new tensor, so a floating result can be finished in place
+        result = torch.abs(value)
+        if result.is_floating_point():
+            return getattr(result, operation + "_")()
+        return getattr(torch, operation)(result)
+    elif operation in ("sin", "cos", "tan", "exp"):
+        return getattr(torch, operation)(value)
+    elif operation in ("floor", "ceil", "round"):
+        result = getattr(torch, operation)(value)
+        if not result.is_floating_point():
+            return result
+        # The scalar path goes through int, which rejects inf/nan and has no negative zero
+        return result.add_(0.0).masked_fill_(~torch.isfinite(value), float('nan'))
+    raise KeyError(operation)
+
+@latent_aware
+def clamp(value, min_value, max_value):
+    torch = sys.modules["torch"]
+    # Same comparisons as max(min_value, min(max_value, value)), elementwise
+    result = torch.where(torch.as_tensor(value < max_value), value, max_value)
+    above = result > min_value
+    if not fits_in_place(result, min_value):
+        return torch.where(above, result, min_value)
+    if is_tensor(min_value):
+        return torch.where(above, result, min_value, out=result)
+    return result.masked_fill_(~above, min_value)
+
+@latent_aware
+def lerp(a, b, t):
+    # b - a is a fresh tensor whenever a or b is one; scale and shift it in place
+    result = b - a
+    if not is_tensor(result):
+        return a + t * result
+    result = apply_owned(result, "mul", t)
+    return apply_owned(result, "add", a)
+
+def tensor_aware(scalar_kernel, tensor_kernel):
+    """Call tensor_kernel when any argument is a tensor or LATENT, scalar_kernel otherwise."""
+    def apply(*args):
+        if has_tensor(*args):
+            return tensor_kernel(*args)
+        return scalar_kernel(*args)
+    return apply
@@ -1,3 +1,7 @@
+import os
+
+from .profiling import PROFILING_ENABLED, instrument
+
 
 class AnyType(str):
     """A special class that is always equal in not equal comparisons. Credit to pythongosssss"""
@@ -13,24 +17,59 @@ class ByPassTypeTuple(tuple):
             return AnyType("*")
         return super().__getitem__(index)
 
+def env_int(name, default):
+    """Integer value of environment variable name, or default if it is unset or not an integer."""
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
 def MakeSmartType(t):
     if isinstance(t, str):
         return SmartType(t)
     return t
 
+# Parsed type sets, interned per distinct type string
+_type_sets = {}
+# (type, other type) -> result of SmartType.__ne__
+_incompatible_cache = {}
+
+def parse_type_set(t):
+    """Return the frozenset of comma-separated types in t, parsed once per distinct string."""
+    if not isinstance(t, str):
+        t = str(t)
+    type_set = _type_sets.get(t)
+    if type_set is None:
+        type_set = _type_sets[str(t)] = frozenset(t.split(','))
+    return type_set
+
+def smart_type_incompatible(t, other):
+    if t == "*" or other == "*":
+        return False
+    return not parse_type_set(t).issubset(parse_type_set(other))
+
 class SmartType(str):
     def __ne__(self, other):
-        if self == "*" or other == "*":
-            return False
-        selfset = set(self.split(','))
-        otherset = set(other.split(','))
-        return not selfset.issubset(otherset)
+        try:
+            return _incompatible_cache[self, other]
+        except KeyError:
+            result = _incompatible_cache[str(self), str(other)] = smart_type_incompatible(self, other)
+            return result
+        except TypeError:
+            # Unhashable values such as combo lists take the uncached path
+            return smart_type_incompatible(self, other)
+
+def copy_input_types(types):
+    """Copy the schema's top-level and category dicts; the entry tuples are immutable and shared."""
+    return {category: dict(entries) if isinstance(entries, dict) else entries for category, entries in types.items()}
 
 def VariantSupport():
     def decorator(cls):
+        # Decorated schema and key -> expected type index, built on first use
+        cache = {}
         if hasattr(cls, "INPUT_TYPES"):
             old_input_types = getattr(cls, "INPUT_TYPES")
-            def new_input_types(*args, **kwargs):
+            def build_input_types(*args, **kwargs):
                 types = old_input_types(*args, **kwargs)
                 for category in ["required", "optional"]:
                     if category not in types:
@@ -39,35 +78,49 @@ def VariantSupport():
                         if isinstance(value, tuple):
                             types[category][key] = (MakeSmartType(value[0]),) + value[1:]
                 return types
+            def new_input_types(*args, **kwargs):
+                if args or kwargs:
+                    return build_input_types(*args, **kwargs)
+                if "types" not in cache:
+                    cache["types"] = build_input_types()
+                return copy_input_types(cache["types"])
             setattr(cls, "INPUT_TYPES", new_input_types)
+        if PROFILING_ENABLED and hasattr(cls, "FUNCTION"):
+            setattr(cls, cls.FUNCTION, instrument(cls.__name__, getattr(cls, cls.FUNCTION)))
         if hasattr(cls, "RETURN_TYPES"):
             old_return_types = cls.RETURN_TYPES
-            setattr(cls, "RETURN_TYPES", tuple(MakeSmartType(x) for x in old_return_types))
+            # Keep the tuple's class so ByPassTypeTuple outputs stay open-ended
+            setattr(cls, "RETURN_TYPES", type(old_return_types)(MakeSmartType(x) for x in old_return_types))
         if hasattr(cls, "VALIDATE_INPUTS"):
             # Reflection is used to determine what the function signature is, so we can't just change the function signature
             raise NotImplementedError("VariantSupport does not support VALIDATE_INPUTS yet")
         else:
-            def validate_individual(input_types, inputs):
+            def expected_types():
+                if "expected" not in cache:
+                    inputs = cls.INPUT_TYPES()
+                    expected = {}
+                    # Required inputs take precedence over optional ones with the same name
+                    for category in ["optional", "required"]:
+                        for key, value in inputs.get(category, {}).items():
+                            expected[key] = value[0]
+                    cache["expected"] = expected
+                return cache["expected"]
+            def validate_individual(input_types, expected):
                 for key, value in input_types.items():
                     if isinstance(value, SmartType):
                         continue
-                    if "required" in inputs and key in inputs["required"]:
-                        expected_type = inputs["required"][key][0]
-                    elif "optional" in inputs and key in inputs["optional"]:
-                        expected_type = inputs["optional"][key][0]
-                    else:
-                        expected_type = None
+                    expected_type = expected.get(key)
                     if expected_type is not None and MakeSmartType(value) != expected_type:
                         return f"Invalid type of {key}: {value} (expected {expected_type})"
                 return True
             def validate_inputs(input_types):
-                inputs = cls.INPUT_TYPES()
+                expected = expected_types()
 
                 if not isinstance(input_types, list):
-                    return validate_individual(input_types, inputs)
+                    return validate_individual(input_types, expected)
 
                 for input_type in input_types:
-                    response = validate_individual(input_type, inputs)
+                    response = validate_individual(input_type, expected)
                     if isinstance(response, str):
                         return response
 